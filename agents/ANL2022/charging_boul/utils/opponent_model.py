@@ -69,6 +69,9 @@ class IssueEstimator:
         self.num_values = value_set.size()
         self.value_trackers = defaultdict(ValueEstimator)
         self.weight = 0
+        # predicted utility by value, recalculated on the first request after an update
+        self.value_utilities = {}
+        self.value_utilities_outdated = False
 
     def update(self, value: Value):
         self.bids_received += 1
@@ -92,30 +95,37 @@ class IssueEstimator:
             self.bids_received - equal_shares
         )
 
-        # recalculate all value utilities
-        for value_tracker in self.value_trackers.values():
-            value_tracker.recalculate_utility(self.max_value_count, self.weight)
+        # value utilities only depend on the counts, the weight and the count of the
+        # most common value. They are recalculated on the first request after updates.
+        self.value_utilities_outdated = True
 
-    def get_value_utility(self, value: Value):
-        if value in self.value_trackers:
-            return self.value_trackers[value].utility
+    def get_value_utilities(self) -> dict:
+        """Predicted utility by value of all values offered so far."""
+        if self.value_utilities_outdated:
+            self.value_utilities = {
+                value: value_tracker.get_utility(self.max_value_count, self.weight)
+                for value, value_tracker in self.value_trackers.items()
+            }
+            self.value_utilities_outdated = False
+
+        return self.value_utilities
 
-        return 0
+    def get_value_utility(self, value: Value):
+        return self.get_value_utilities().get(value, 0)
 
 
 class ValueEstimator:
     def __init__(self):
         self.count = 0
-        self.utility = 0
 
     def update(self):
         self.count += 1
 
-    def recalculate_utility(self, max_value_count: int, weight: float):
+    def get_utility(self, max_value_count: int, weight: float) -> float:
         if weight < 1:
             mod_value_count = ((self.count + 1) ** (1 - weight)) - 1
             mod_max_value_count = ((max_value_count + 1) ** (1 - weight)) - 1
 
-            self.utility = mod_value_count / mod_max_value_count
+            return mod_value_count / mod_max_value_count
         else:
-            self.utility = 1
+            return 1
@@ -1,12 +1,9 @@
-from geniusweb.bidspace.BidsWithUtility import BidsWithUtility
-from geniusweb.bidspace.Interval import Interval
-from geniusweb.bidspace.IssueInfo import IssueInfo
 from geniusweb.issuevalue.Bid import Bid
-from geniusweb.issuevalue.Value import Value
 from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
 from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
 from decimal import Decimal
-from typing import List
+
+from utils.utility_index import SortedUtilityIndex
 
 
 class ExtendedUtilSpace:
@@ -17,7 +14,7 @@ class ExtendedUtilSpace:
 
     def __init__(self, space: LinearAdditive):
         self._utilspace = space
-        self._bidutils = BidsWithUtility.create(self._utilspace)
+        self._index = SortedUtilityIndex(self._utilspace)
         self._computeMinMax()
         self._tolerance = self._computeTolerance()
 
@@ -25,14 +22,10 @@ class ExtendedUtilSpace:
         """
         Computes the fields minutil and maxUtil.
         <p>
-        TODO this is simplistic, very expensive method and may cause us to run
-        out of time on large domains.
-        <p>
-        Assumes that utilspace and bidutils have been set properly.
+        Assumes that utilspace and index have been set properly.
         """
-        range = self._bidutils.getRange()
-        self._minUtil = range.getMin()
-        self._maxUtil = range.getMax()
+        self._minUtil = Decimal(self._index.get_min())
+        self._maxUtil = Decimal(self._index.get_max())
 
         rvbid = self._utilspace.getReservationBid()
         if rvbid != None:
@@ -50,17 +43,7 @@ class ExtendedUtilSpace:
                 between the weighted utility of the best and one-but-best issue
                 value.
         """
-        tolerance = Decimal(1)
-        for iss in self._bidutils.getInfo():
-            if iss.getValues().size() > 1:
-                # we have at least 2 values.
-                values: List[Decimal] = []
-                for val in iss.getValues():
-                    values.append(iss.getWeightedUtil(val))
-                values.sort()
-                values.reverse()
-                tolerance = min(tolerance, values[0] - values[1])
-        return tolerance
+        return Decimal(self._index.get_tolerance())
 
     def getMin(self) -> Decimal:
         return self._minUtil
@@ -74,6 +57,6 @@ class ExtendedUtilSpace:
         @return bids with utility inside [utilitygoal-{@link #tolerance},
                 utilitygoal]
         """
-        return self._bidutils.getBids(
-            Interval(utilityGoal - self._tolerance, utilityGoal)
+        return self._index.get_bids(
+            float(utilityGoal - self._tolerance), float(utilityGoal)
         )
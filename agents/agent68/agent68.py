@@ -1,13 +1,12 @@
 import logging
-from random import randint
 from time import time
 from typing import cast
 
+import numpy as np
 from geniusweb.actions.Accept import Accept
 from geniusweb.actions.Action import Action
 from geniusweb.actions.Offer import Offer
 from geniusweb.actions.PartyId import PartyId
-from geniusweb.bidspace.AllBidsList import AllBidsList
 from geniusweb.inform.ActionDone import ActionDone
 from geniusweb.inform.Finished import Finished
 from geniusweb.inform.Inform import Inform
@@ -27,7 +26,9 @@ from geniusweb.progress.ProgressTime import ProgressTime
 from geniusweb.references.Parameters import Parameters
 from tudelft_utilities_logging.ReportToLogger import ReportToLogger
 
+from .utils.bid_space import BidSpace
 from .utils.opponent_model import OpponentModel
+from .utils.pareto import pareto_mask
 
 
 class Agent68(DefaultParty):
@@ -49,6 +50,11 @@ class Agent68(DefaultParty):
         self.settings: Settings = None
         self.storage_dir: str = None
         self.current_bid: Bid = None
+        self.bid_space: BidSpace = None
+        # utilities of all bids in the bid space, the opponent utilities are
+        # predicted when needed and reset when the opponent model changes
+        self.utilities: np.ndarray = None
+        self.opponent_utilities: np.ndarray = None
 
         self.last_received_bid: Bid = None
         self.opponent_model: OpponentModel = None
@@ -82,6 +88,10 @@ class Agent68(DefaultParty):
             self.profile = profile_connection.getProfile()
             self.domain = self.profile.getDomain()
             profile_connection.close()
+
+            # the utilities of all bids are calculated at once
+            self.bid_space = BidSpace(self.domain)
+            self.utilities = self.bid_space.get_utilities(self.profile)
             self.determine_good_utility()
 
         # ActionDone informs you of an action (an offer or an accept)
@@ -152,12 +162,13 @@ class Agent68(DefaultParty):
         if isinstance(action, Offer):
             # create opponent model if it was not yet initialised
             if self.opponent_model is None:
-                self.opponent_model = OpponentModel(self.domain)
+                self.opponent_model = OpponentModel(self.domain, self.bid_space)
 
             bid = cast(Offer, action).getBid()
 
             # update opponent model with bid
             self.opponent_model.update(bid)
+            self.opponent_utilities = None
             # set bid as last received
             self.last_received_bid = bid
 
@@ -191,23 +202,9 @@ class Agent68(DefaultParty):
     ###########################################################################################
 
     def determine_good_utility(self):
-        """Determines the quantile utility by selecting the utility of the 75th highest bid out of 500 random bids."""
-        
-        domain = self.profile.getDomain()
-        all_bids = AllBidsList(domain)
-
-        utilities = []
-        # Take random 10% of all bids
-        all_bids_size = int(all_bids.size() * 0.1)
-        for _ in range(all_bids_size):
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
-            utilities.append(float(self.profile.getUtility(bid))) 
-        
-        utilities.sort(reverse=True)
-
-        top_5 = int(all_bids_size*0.02)
-        top_x_percent = utilities[:top_5] 
-        self.good_utility_threshold = top_x_percent[-1]
+        """Determines the good utility threshold as the utility of the bid at the top 2% of all bids."""
+        top_x_percent = max(int(len(self.utilities) * 0.02), 1)
+        self.good_utility_threshold = float(np.partition(self.utilities, -top_x_percent)[-top_x_percent])
 
 
     def accept_condition(self, bid: Bid) -> bool:
@@ -241,37 +238,54 @@ class Agent68(DefaultParty):
 
     
     def find_bid(self) -> Bid:
-        domain = self.profile.getDomain()
-        all_bids = AllBidsList(domain)
-
-        # Initialize lists to store candidate bids and new Pareto-efficient bids
-        candidate_bids = []
-        pareto_bids = []
-        # Generate 10% of the total bids random bids and evaluate their utility for both the agent and the opponent
-        for _ in range(int(all_bids.size() * 0.1)):  
-            bid = all_bids.get(randint(0, all_bids.size() - 1))
-            our_utility = self.profile.getUtility(bid)
-            opponent_utility = self.opponent_model.get_predicted_utility(bid) if self.opponent_model is not None else 0
-            candidate_bids.append((bid, our_utility, opponent_utility))
-
-        # Filter out non-Pareto-efficient bids
-        for bid, our_utility, opponent_utility in candidate_bids:
-            # A bid is Pareto-efficient if there is no other bid that dominates it in both utilities
-            if not any(
-                (other_our_utility >= our_utility and other_opponent_utility > opponent_utility) or
-                (other_our_utility > our_utility and other_opponent_utility >= opponent_utility)
-                for _, other_our_utility, other_opponent_utility in candidate_bids
-            ):
-                # If the bid is Pareto-efficient, add it to the new Pareto frontier
-                pareto_bids.append((bid, our_utility, opponent_utility))
-
-        # If there are Pareto-efficient bids, select the one with the highest score
-        if pareto_bids:
-            return max(pareto_bids, key=lambda x: self.score_bid(x[0]))[0]
-
-        # If no Pareto-efficient bids are found, return the first candidate bid
-        return candidate_bids[0][0]
+        # Evaluate the utility of all bids for both the agent and the opponent
+        candidate_ids = np.arange(self.bid_space.size)
+        our_utilities = self.utilities[candidate_ids]
+        opponent_utilities = self.get_opponent_utilities(candidate_ids)
+
+        # Filter out non-Pareto-efficient bids, a bid is Pareto-efficient if there is no
+        # other bid that dominates it in both utilities
+        pareto_ids = candidate_ids[pareto_mask(our_utilities, opponent_utilities)]
+
+        # Select the Pareto-efficient bid with the highest score
+        scores = self.score_bids(pareto_ids)
+        return self.bid_space.id_to_bid(pareto_ids[np.argmax(scores)])
+
+    def get_opponent_utilities(self, bid_ids: np.ndarray) -> np.ndarray:
+        """Predicted opponent utilities of bids. The predictions for all bids are cached until the opponent model changes.
+
+        Args:
+            bid_ids (np.ndarray): ids of the bids in the bid space
+
+        Returns:
+            np.ndarray: predicted utilities, 0 if there is no opponent model yet
+        """
+        if self.opponent_model is None:
+            return np.zeros(len(bid_ids))
 
+        if self.opponent_utilities is None:
+            self.opponent_utilities = self.opponent_model.predict_many()
+
+        return self.opponent_utilities[bid_ids]
+
+    def score_bids(self, bid_ids: np.ndarray, alpha: float = 0.95, eps: float = 0.1) -> np.ndarray:
+        """Calculate the heuristic score of `score_bid` for many bids at once
+
+        Args:
+            bid_ids (np.ndarray): ids of the bids in the bid space
+            alpha (float, optional): see `score_bid`. Defaults to 0.95.
+            eps (float, optional): see `score_bid`. Defaults to 0.1.
+
+        Returns:
+            np.ndarray: scores
+        """
+        progress = self.progress.get(time() * 1000)
+        time_pressure = 1.0 - progress ** (1 / eps)
+
+        scores = alpha * time_pressure * self.utilities[bid_ids]
+        if self.opponent_model is not None:
+            scores += (1.0 - alpha * time_pressure) * self.get_opponent_utilities(bid_ids)
+        return scores
 
     def score_bid(self, bid: Bid, alpha: float = 0.95, eps: float = 0.1) -> float:
         """Calculate heuristic score for a bid
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.issuevalue.Domain import Domain
+from geniusweb.issuevalue.Value import Value
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+
+
+class BidSpace:
+    """All bids of a discrete domain, encoded as integers. A bid id is the mixed radix
+    number of the value indices of the issues (issues sorted by name, the last issue
+    changes fastest), so converting between bid ids and Bid objects is O(1) and the
+    utilities of many bids can be calculated at once with NumPy.
+
+    Copy of `utils.bid_space.BidSpace` of the repository, so that the agent only depends on
+    files in its own directory. Bid ids are the same as those of the repository.
+    """
+
+    def __init__(self, domain: Domain):
+        self.domain = domain
+        self.issues: List[str] = sorted(domain.getIssues())
+        self.values: List[List[Value]] = [
+            list(domain.getValues(issue)) for issue in self.issues
+        ]
+        self.value_ids: List[Dict[Value, int]] = [
+            {value: i for i, value in enumerate(values)} for values in self.values
+        ]
+
+        self.radices = np.array([len(values) for values in self.values], dtype=np.int64)
+        # the last issue changes fastest
+        self.strides = np.ones(len(self.issues), dtype=np.int64)
+        self.strides[:-1] = np.cumprod(self.radices[::-1])[::-1][1:]
+        self.size = int(np.prod(self.radices))
+
+    def bid_to_id(self, bid: Bid) -> int:
+        bid_id = 0
+        for issue, value_ids, stride in zip(self.issues, self.value_ids, self.strides):
+            bid_id += value_ids[bid.getValue(issue)] * int(stride)
+        return bid_id
+
+    def bids_to_ids(self, bids: Iterable[Bid]) -> np.ndarray:
+        return np.array([self.bid_to_id(bid) for bid in bids], dtype=np.int64)
+
+    def id_to_bid(self, bid_id: int) -> Bid:
+        bid_id = int(bid_id)
+        values = {}
+        for issue, issue_values, stride, radix in zip(
+            self.issues, self.values, self.strides, self.radices
+        ):
+            values[issue] = issue_values[(bid_id // int(stride)) % int(radix)]
+        return Bid(values)
+
+    def get_value_indices(self, bid_ids: np.ndarray = None) -> np.ndarray:
+        """Decode bid ids to value indices.
+
+        Args:
+            bid_ids (np.ndarray, optional): bid ids to decode. Defaults to all bids.
+
+        Returns:
+            np.ndarray: (n, num_issues) array with the value index of every issue
+        """
+        if bid_ids is None:
+            return np.indices(tuple(self.radices)).reshape(len(self.radices), -1).T
+        bid_ids = np.asarray(bid_ids, dtype=np.int64)
+        return (bid_ids[:, None] // self.strides) % self.radices
+
+    def get_utility_tables(self, profile: LinearAdditive) -> List[np.ndarray]:
+        """Weighted utility of every value of every issue as floats.
+
+        Args:
+            profile (LinearAdditive): profile to obtain the weights and utilities from
+
+        Returns:
+            List[np.ndarray]: per issue, an array with issue weight * value utility
+        """
+        utilities = profile.getUtilities()
+        return [
+            np.array(
+                [float(profile.getWeight(issue) * utilities[issue].getUtility(v)) for v in values]
+            )
+            for issue, values in zip(self.issues, self.values)
+        ]
+
+    def evaluate(self, utility_tables: List[np.ndarray], bid_ids: np.ndarray = None) -> np.ndarray:
+        """Calculate the utility of bids as the sum of weighted value utilities.
+
+        Args:
+            utility_tables (List[np.ndarray]): per issue, the weighted utility of every value
+            bid_ids (np.ndarray, optional): bids to evaluate. Defaults to all bids.
+
+        Returns:
+            np.ndarray: utility of every bid
+        """
+        value_indices = self.get_value_indices(bid_ids)
+        utilities = np.zeros(len(value_indices))
+        for column, utility_table in enumerate(utility_tables):
+            utilities += utility_table[value_indices[:, column]]
+        return utilities
+
+    def get_utilities(self, profile: LinearAdditive, bid_ids: np.ndarray = None) -> np.ndarray:
+        return self.evaluate(self.get_utility_tables(profile), bid_ids)
@@ -1,16 +1,20 @@
 import math
 from collections import defaultdict
 
+import numpy as np
 from geniusweb.issuevalue.Bid import Bid
 from geniusweb.issuevalue.DiscreteValueSet import DiscreteValueSet
 from geniusweb.issuevalue.Domain import Domain
 from geniusweb.issuevalue.Value import Value
 
+from .bid_space import BidSpace
+
 
 class OpponentModel:
-    def __init__(self, domain: Domain):
+    def __init__(self, domain: Domain, bid_space: BidSpace = None):
         self.offers = []
         self.domain = domain
+        self.bid_space = bid_space if bid_space is not None else BidSpace(domain)
 
         self.issue_estimators = {
             i: IssueEstimator(v) for i, v in domain.getIssuesValues().items()
@@ -49,6 +53,34 @@ class OpponentModel:
 
         return predicted_utility
 
+    def predict_many(self, bid_ids: np.ndarray = None) -> np.ndarray:
+        """Predicted utility of many bids at once, see `get_predicted_utility`.
+
+        Args:
+            bid_ids (np.ndarray, optional): ids of the bids in the bid space. Defaults to all bids.
+
+        Returns:
+            np.ndarray: predicted utility of every bid
+        """
+        if len(self.offers) == 0:
+            size = self.bid_space.size if bid_ids is None else len(bid_ids)
+            return np.zeros(size)
+
+        # calculate the total weight of all issues
+        total_weight = sum(est.weight for est in self.issue_estimators.values())
+        if total_weight == 0: total_weight = len(self.issue_estimators)
+
+        # per issue, the weighted predicted utility of every value
+        utility_tables = []
+        for issue_id, values in zip(self.bid_space.issues, self.bid_space.values):
+            issue_estimator = self.issue_estimators[issue_id]
+            issue_weight = issue_estimator.weight / total_weight
+            utility_tables.append(
+                np.array([issue_weight * issue_estimator.get_value_utility(v) for v in values])
+            )
+
+        return self.bid_space.evaluate(utility_tables, bid_ids)
+
 
 class IssueEstimator:
     def __init__(self, value_set: DiscreteValueSet):
@@ -58,41 +90,38 @@ class IssueEstimator:
         self.bids_received = 0  # the number of times this issue has been updated
         self.num_values = value_set.size()  # the total number of values for current issue
         self.value_trackers = defaultdict(ValueEstimator)  # we have one estimator per value
+        self.total_weighted = 0  # running total of the weighted counts of all values
+        self.max_weighted = 0  # weighted count of the most offered value
         self.weight = 0  # how important this issue seems to be
 
     def update(self, value: Value, time_weight: float):
         self.bids_received += 1
 
         # update the weighted count of the given issue value
-        self.value_trackers[value].update(time_weight)
-
-        # get the total weight of all values for this issue
-        total_weighted = sum(vt.weighted_count for vt in self.value_trackers.values())
+        value_tracker = self.value_trackers[value]
+        value_tracker.update(time_weight)
 
-        # recalculate the utilities of all values with the new total weight
-        for value_tracker in self.value_trackers.values():
-            value_tracker.recalculate_utility(total_weighted)
+        # counts only increase, so the total and the maximum can be kept up to date
+        # without going over all values
+        self.total_weighted += time_weight
+        self.max_weighted = max(self.max_weighted, value_tracker.weighted_count)
 
         # this issue is more important if one value persists (the opponent does not concede easily)
-        if total_weighted > 0:
-            max_count = max(vt.weighted_count for vt in self.value_trackers.values())
-            self.weight = max_count / total_weighted
+        if self.total_weighted > 0:
+            self.weight = self.max_weighted / self.total_weighted
         else:
             self.weight = 0
 
     def get_value_utility(self, value: Value):
-        if value in self.value_trackers: return self.value_trackers[value].utility 
+        # value utilities are normalised by the total weighted count when requested
+        if value in self.value_trackers and self.total_weighted > 0:
+            return self.value_trackers[value].weighted_count / self.total_weighted
         else: return 0
 
 
 class ValueEstimator:
     def __init__(self):
         self.weighted_count = 0
-        self.utility = 0
 
     def update(self, time_weight: float):
         self.weighted_count += time_weight
-
-    def recalculate_utility(self, total_weighted_bids: float):
-        if total_weighted_bids > 0: self.utility = self.weighted_count / total_weighted_bids
-        else: self.utility = 0
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def pareto_mask(utilities_a: np.ndarray, utilities_b: np.ndarray) -> np.ndarray:
+    """Find the bids that are not dominated by any other bid. A bid is dominated if another
+    bid has a higher or equal utility on both sides and is strictly better on one side.
+    Bids with equal utilities do not dominate each other.
+
+    Instead of comparing all pairs of bids, the bids are sorted on both utilities and swept
+    once while keeping the running maximum of utility b, which is O(n log n).
+
+    Args:
+        utilities_a (np.ndarray): utilities of the bids for side a
+        utilities_b (np.ndarray): utilities of the bids for side b
+
+    Returns:
+        np.ndarray: boolean mask of the bids that are Pareto efficient
+    """
+    num_bids = len(utilities_a)
+    if num_bids == 0:
+        return np.zeros(0, dtype=bool)
+
+    # sort on utility a and then utility b, both descending
+    order = np.lexsort((-utilities_b, -utilities_a))
+    sorted_a = utilities_a[order]
+    sorted_b = utilities_b[order]
+
+    # index of the first bid with the same utility a, for every bid
+    new_group = np.ones(num_bids, dtype=bool)
+    new_group[1:] = sorted_a[1:] != sorted_a[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(num_bids), 0))
+
+    # best utility b of all bids with a strictly higher utility a
+    running_max_b = np.maximum.accumulate(sorted_b)
+    best_b_before = np.where(group_start > 0, running_max_b[group_start - 1], -np.inf)
+
+    # dominated by a bid with a higher utility a, or by a bid with the same utility a
+    # and a higher utility b (the first bid of the group has the highest utility b)
+    dominated = (best_b_before >= sorted_b) | (sorted_b[group_start] > sorted_b)
+
+    mask = np.empty(num_bids, dtype=bool)
+    mask[order] = ~dominated
+    return mask
@@ -1,19 +1,33 @@
 import json
+from glob import glob
 import os
 from pathlib import Path
 import random
 import time
 
+from utils.hash_seed import pin_hash_seed
 from utils.runners import run_tournament
 
-RESULTS_DIR = Path("final_results", time.strftime('%Y%m%d-%H%M%S'))
+# run with a fixed hash seed, so that the sessions can be replayed in another process
+pin_hash_seed()
+
+# set the RESULTS_DIR environment variable to the results directory of an interrupted tournament to resume it with the same SEED
+RESULTS_DIR = Path(os.environ.get("RESULTS_DIR", Path("final_results", time.strftime('%Y%m%d-%H%M%S'))))
+# budget in seconds, the tournament does not start if its estimated duration exceeds it (None for no budget)
+MAX_COST = None
+# number of processes to run sessions in parallel
+WORKERS = int(os.environ.get("WORKERS", 1))
 
 # create results directory if it does not exist
 if not RESULTS_DIR.exists():
     RESULTS_DIR.mkdir(parents=True)
 
+# seed of the domain selection and the sessions, set the SEED environment variable to reproduce a run
+SEED = int(os.environ.get("SEED", time.time_ns() % 2**32))
+print(f"Seed: {SEED}")
+
 numbers = [f"{i:02}" for i in range(50)]
-random_selection = random.sample(numbers, 2)
+random_selection = random.Random(SEED).sample(numbers, 2)
 
 # Settings to run a negotiation session:
 #   You need to specify the classpath of 2 agents to start a negotiation. Parameters for the agent can be added as a dict (see example)
@@ -127,10 +141,18 @@ tournament_settings = {
         ["domains/domain" + random_selection[1] + "/profileA.json", "domains/domain" + random_selection[1] + "/profileB.json"],
     ],
     "deadline_time_ms": 10000,
+    "seed": SEED,
 }
 
 # run a session and obtain results in dictionaries
-tournament_steps, tournament_results, tournament_results_summary = run_tournament(tournament_settings)
+tournament_steps, tournament_results, tournament_results_summary = run_tournament(
+    tournament_settings,
+    workers=WORKERS,
+    results_log=RESULTS_DIR.joinpath("tournament_sessions.jsonl"),
+    leaderboard=RESULTS_DIR.joinpath("leaderboard.csv"),
+    max_cost=MAX_COST,
+    history=glob("final_results/*/tournament_sessions*.jsonl"),
+)
 
 # save the tournament settings for reference
 with open(RESULTS_DIR.joinpath("tournament_steps.json"), "w", encoding="utf-8") as f:
@@ -0,0 +1,39 @@
+import argparse
+import json
+import time
+from glob import glob
+from pathlib import Path
+
+from utils.runners import merge_results_logs
+
+# Combines the results logs of a tournament that was split into shards (see `shard_index` and `num_shards` of
+# `run_tournament`) into the same result files as a tournament that ran on a single host. The shards of a tournament
+# write their results logs to the shard subdirectories of the RESULTS_DIR they share (see run_tournament.py), logs of
+# different tournaments are rejected. Example:
+#   python merge_tournament.py "results/<tournament>/shard*/tournament_sessions.jsonl" --output results/<tournament>
+parser = argparse.ArgumentParser(description="Merge the results logs of tournament shards.")
+parser.add_argument("results_logs", nargs="+", help="paths or glob patterns of the results logs")
+parser.add_argument("--output", default=None, help="results directory, defaults to results/<timestamp>")
+args = parser.parse_args()
+
+results_logs = sorted({path for pattern in args.results_logs for path in glob(pattern)})
+if not results_logs:
+    raise FileNotFoundError(f"No results logs found for {args.results_logs}")
+
+RESULTS_DIR = Path(args.output) if args.output else Path("results", time.strftime('%Y%m%d-%H%M%S'))
+
+# create results directory if it does not exist
+if not RESULTS_DIR.exists():
+    RESULTS_DIR.mkdir(parents=True)
+
+tournament_steps, tournament_results, tournament_results_summary = merge_results_logs(results_logs)
+print(f"Merged {len(tournament_results)} sessions from {len(results_logs)} results logs")
+
+# save the tournament settings for reference
+with open(RESULTS_DIR.joinpath("tournament_steps.json"), "w", encoding="utf-8") as f:
+    f.write(json.dumps(tournament_steps, indent=2))
+# save the tournament results
+with open(RESULTS_DIR.joinpath("tournament_results.json"), "w", encoding="utf-8") as f:
+    f.write(json.dumps(tournament_results, indent=2))
+# save the tournament results summary
+tournament_results_summary.to_csv(RESULTS_DIR.joinpath("tournament_results_summary.csv"))
@@ -0,0 +1,67 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from utils.hash_seed import pin_hash_seed
+from utils.plot_trace import plot_trace
+from utils.results_log import ResultsLog
+from utils.runners import run_session
+
+# Re-runs a session of a tournament from its results log with the same agents, profiles, deadline and seed.
+# Sessions without a round deadline are replayed on a virtual clock, so that the replay does not depend on the
+# speed of the host and every replay of a session is identical. Example:
+#   python replay_session.py results/<timestamp>/tournament_sessions.jsonl <session key or a prefix of it>
+parser = argparse.ArgumentParser(description="Replay a session of a tournament.")
+parser.add_argument("results_log", help="results log of the tournament")
+parser.add_argument("key", help="key of the session, a unique prefix is enough")
+parser.add_argument("--virtual-turn-ms", type=int, default=10, help="virtual time per action in ms")
+parser.add_argument("--output", default=None, help="results directory, defaults to results/<timestamp>")
+args = parser.parse_args()
+
+# fields of the session summary that depend on the host and are not compared with the replay
+TIMING_FIELDS = ("duration_s", "import_time_s")
+
+entries = [e for e in ResultsLog(args.results_log).read_entries() if e["key"].startswith(args.key)]
+if len(entries) != 1:
+    raise ValueError(f"Found {len(entries)} sessions with key {args.key} in {args.results_log}")
+entry = entries[0]
+
+# the iteration order of sets of strings depends on the hash seed, replay with the hash seed of the session
+pin_hash_seed(entry["summary"].get("hash_seed"))
+if entry["summary"].get("hash_seed") is None:
+    print("WARNING: the session ran with randomised hashes, agents that iterate over sets can behave differently")
+
+settings = entry["settings"]
+if settings.get("seed") is None:
+    print("WARNING: the session has no seed, agents that use random numbers will behave differently")
+if "deadline_rounds" not in settings and "virtual_turn_ms" not in settings:
+    print(f"Session ran on the wall-clock, replaying it on a virtual clock of {args.virtual_turn_ms} ms per action")
+    settings["virtual_turn_ms"] = args.virtual_turn_ms
+
+RESULTS_DIR = Path(args.output) if args.output else Path("results", time.strftime('%Y%m%d-%H%M%S'))
+
+# create results directory if it does not exist
+if not RESULTS_DIR.exists():
+    RESULTS_DIR.mkdir(parents=True)
+
+# run the session and obtain results in dictionaries
+session_results_trace, session_results_summary = run_session(settings)
+
+# compare with the recorded summary
+for field, recorded in entry["summary"].items():
+    replayed = session_results_summary.get(field)
+    if field not in TIMING_FIELDS and replayed != recorded:
+        print(f"{field}: recorded {recorded}, replayed {replayed}")
+
+# plot trace to html file
+if not session_results_trace["error"]:
+    plot_trace(session_results_trace, RESULTS_DIR.joinpath("trace_plot.html"))
+
+# write results to file
+with open(RESULTS_DIR.joinpath("session_settings.json"), "w", encoding="utf-8") as f:
+    f.write(json.dumps(settings, indent=2))
+with open(RESULTS_DIR.joinpath("session_results_trace.json"), "w", encoding="utf-8") as f:
+    f.write(json.dumps(session_results_trace, indent=2))
+with open(RESULTS_DIR.joinpath("session_results_summary.json"), "w", encoding="utf-8") as f:
+    f.write(json.dumps(session_results_summary, indent=2))
@@ -6,6 +6,8 @@ from utils.plot_trace import plot_trace
 from utils.runners import run_session
 
 RESULTS_DIR = Path("results", time.strftime('%Y%m%d-%H%M%S'))
+# also write the actions of the session to a compressed parquet file (requires pyarrow)
+COLUMNAR_OUTPUT = False
 
 # create results directory if it does not exist
 if not RESULTS_DIR.exists():
@@ -15,6 +17,8 @@ if not RESULTS_DIR.exists():
 #   You need to specify the classpath of 2 agents to start a negotiation. Parameters for the agent can be added as a dict (see example)
 #   You need to specify the preference profiles for both agents. The first profile will be assigned to the first agent.
 #   You need to specify a time deadline (is milliseconds (ms)) we are allowed to negotiate before we end without agreement
+#   Instead, you can set `deadline_rounds` to end the negotiation after a number of rounds (`deadline_time_ms` then defaults to 60000).
+#   Optionally, you can set `virtual_turn_ms` to run on a virtual clock that advances this many ms per action instead of the wall-clock.
 settings = {
     "agents": [
         {
@@ -31,7 +35,10 @@ settings = {
 }
 
 # run a session and obtain results in dictionaries
-session_results_trace, session_results_summary = run_session(settings)
+session_results_trace, session_results_summary = run_session(
+    settings,
+    actions_file=RESULTS_DIR.joinpath("session_actions.parquet") if COLUMNAR_OUTPUT else None,
+)
 
 # plot trace to html file
 if not session_results_trace["error"]:
@@ -1,11 +1,32 @@
 import json
+from glob import glob
 import os
 from pathlib import Path
 import time
 
+from utils.hash_seed import pin_hash_seed
 from utils.runners import run_tournament
 
-RESULTS_DIR = Path("results", time.strftime('%Y%m%d-%H%M%S'))
+# run with a fixed hash seed, so that the sessions can be replayed in another process
+pin_hash_seed()
+
+# set the RESULTS_DIR environment variable to the results directory of an interrupted tournament to resume it
+RESULTS_DIR = Path(os.environ.get("RESULTS_DIR", Path("results", time.strftime('%Y%m%d-%H%M%S'))))
+# budget in seconds, the tournament does not start if its estimated duration exceeds it (None for no budget)
+MAX_COST = None
+# number of processes to run sessions in parallel
+WORKERS = int(os.environ.get("WORKERS", 1))
+# split the tournament over multiple hosts, every host runs one shard (e.g. set by the array index of a batch job)
+# and the results logs of the shards are combined with merge_tournament.py. All shards must get the same RESULTS_DIR,
+# every shard writes its results to a shard<SHARD_INDEX> subdirectory of it.
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", 0))
+NUM_SHARDS = int(os.environ.get("NUM_SHARDS", 1))
+if NUM_SHARDS > 1:
+    if "RESULTS_DIR" not in os.environ:
+        raise ValueError("Set RESULTS_DIR to a results directory that is shared by all shards of the tournament")
+    RESULTS_DIR = RESULTS_DIR.joinpath(f"shard{SHARD_INDEX}")
+# also write the actions and summaries of the sessions to compressed parquet files (requires pyarrow)
+COLUMNAR_OUTPUT = False
 
 # create results directory if it does not exist
 if not RESULTS_DIR.exists():
@@ -15,6 +36,13 @@ if not RESULTS_DIR.exists():
 #   You need to specify the classpath of 2 agents to start a negotiation. Parameters for the agent can be added as a dict (see example)
 #   You need to specify the preference profiles for both agents. The first profile will be assigned to the first agent.
 #   You need to specify a time deadline (is milliseconds (ms)) we are allowed to negotiate before we end without agreement.
+#   Instead, you can set `deadline_rounds` to end the negotiation after a number of rounds (`deadline_time_ms` then defaults to 60000).
+#   Optionally, you can set `virtual_turn_ms` to run on a virtual clock that advances this many ms per action instead of the wall-clock.
+#   Optionally, you can set `repetitions` to play every session multiple times.
+#   Session summaries are appended to `tournament_sessions.jsonl`, sessions that are already in the log are skipped, so an interrupted tournament can be resumed.
+#   Optionally, you can set `session_limits` (`timeout_s`, `cpu_time_s`, `memory_mb`) to run every session in a separate process that is killed when it exceeds a limit.
+#   Optionally, you can set `seed` to give every session a reproducible seed (recorded in the session summary), see replay_session.py.
+#   `leaderboard.csv` holds the tournament summary so far and is updated after every session.
 tournament_settings = {
     "agents": [
         {
@@ -76,7 +104,17 @@ tournament_settings = {
 }
 
 # run a session and obtain results in dictionaries
-tournament_steps, tournament_results, tournament_results_summary = run_tournament(tournament_settings)
+tournament_steps, tournament_results, tournament_results_summary = run_tournament(
+    tournament_settings,
+    workers=WORKERS,
+    results_log=RESULTS_DIR.joinpath("tournament_sessions.jsonl"),
+    leaderboard=RESULTS_DIR.joinpath("leaderboard.csv"),
+    max_cost=MAX_COST,
+    history=glob("results/**/tournament_sessions.jsonl", recursive=True),
+    columnar_dir=RESULTS_DIR.joinpath("columnar") if COLUMNAR_OUTPUT else None,
+    shard_index=SHARD_INDEX,
+    num_shards=NUM_SHARDS,
+)
 
 # save the tournament settings for reference
 with open(RESULTS_DIR.joinpath("tournament_steps.json"), "w", encoding="utf-8") as f:
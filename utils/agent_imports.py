@@ -0,0 +1,25 @@
+import importlib
+import time
+from typing import List
+
+
+def import_agent_classes(agents: List[dict]) -> float:
+    """Import the modules of the agent classes, so that sessions do not have to import them.
+    Modules that were imported before are taken from `sys.modules` and cost (almost) nothing.
+
+    Args:
+        agents (List[dict]): agent settings with the class path under "class"
+
+    Returns:
+        float: time spent importing in seconds
+    """
+    start = time.perf_counter()
+    for agent in agents:
+        module_name = agent["class"].rsplit(".", 1)[0]
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            # the session of this agent reports the error
+            print(f"WARNING: could not import {module_name}: {e!r}")
+
+    return time.perf_counter() - start
@@ -0,0 +1,34 @@
+from typing import List
+
+import numpy as np
+
+# Encoding of bids as integers (bid ids), shared by `utils.bid_space.BidSpace`, the compact domain sidecar
+# (`utils.compact_domain`) and the columnar action logs (`utils.columnar`). A bid id is the mixed radix number of
+# the value indices of the issues, with the issues sorted by name and the last issue changing fastest. The value
+# index is the position of the value in the value list of the issue in the domain.
+
+
+def sort_issues(issues) -> List[str]:
+    """Issues in the order of the bid id encoding."""
+    return sorted(issues)
+
+
+def get_strides(radices: np.ndarray) -> np.ndarray:
+    """Value of a step of the value index of every issue, given the number of values (radix) of every issue."""
+    radices = np.asarray(radices, dtype=np.int64)
+    strides = np.ones(len(radices), dtype=np.int64)
+    strides[:-1] = np.cumprod(radices[::-1])[::-1][1:]
+    return strides
+
+
+def encode_bid_ids(value_indices: np.ndarray, radices: np.ndarray) -> np.ndarray:
+    """Encode an (n, num_issues) array of value indices to bid ids."""
+    value_indices = np.asarray(value_indices, dtype=np.int64).reshape(-1, len(radices))
+    return value_indices @ get_strides(radices)
+
+
+def decode_bid_ids(bid_ids: np.ndarray, radices: np.ndarray) -> np.ndarray:
+    """Decode bid ids to an (n, num_issues) array of value indices."""
+    radices = np.asarray(radices, dtype=np.int64)
+    bid_ids = np.asarray(bid_ids, dtype=np.int64)
+    return (bid_ids[:, None] // get_strides(radices)) % radices
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Offer import Offer
+from geniusweb.protocol.session.saop.SAOPState import SAOPState
+
+from utils.profile_cache import load_profile
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    # columnar output is optional, the JSON and csv results do not need pyarrow
+    pa = None
+
+COMPRESSION = "zstd"
+
+# Columnar results directory layout:
+#   actions/<session_id>.parquet   one row per action of a session
+#   sessions.parquet               one row per session (the session summaries)
+# The files can be queried without loading everything, e.g. with
+#   open_actions_dataset(directory).to_table(columns=["actor", "utility_1"], filter=...)
+#   pd.read_parquet(directory / "sessions.parquet", columns=["agent_1", "result"])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar output requires pyarrow: pip install pyarrow")
+
+
+def get_actions_table(results_class: SAOPState, session_id: str) -> "pa.Table":
+    """Create a table with one row per action of a session.
+
+    Args:
+        results_class (SAOPState): final state of the session
+        session_id (str): id of the session, e.g. the key of the session in the results log
+
+    Returns:
+        pa.Table: session id, action index, round, action type, actor, bid id and the
+            utility of the bid for every party (NaN for actions without a bid)
+    """
+    _require_pyarrow()
+    party_profiles = results_class.getPartyProfiles()
+    actions = results_class.getActions()
+
+    cached_profiles = [
+        load_profile(str(party_profile.getProfile().getURI()))
+        for party_profile in party_profiles.values()
+    ]
+    bid_space = cached_profiles[0].bid_space
+
+    has_bid = np.array([isinstance(action, (Offer, Accept)) for action in actions], dtype=bool)
+    bid_ids = np.zeros(len(actions), dtype=np.int64)
+    bid_ids[has_bid] = bid_space.bids_to_ids(
+        [action.getBid() for action in actions if isinstance(action, (Offer, Accept))]
+    )
+
+    columns = {
+        "session_id": pa.array([session_id] * len(actions), pa.string()),
+        "action_index": pa.array(np.arange(len(actions), dtype=np.int32)),
+        "round": pa.array(np.arange(len(actions), dtype=np.int32) // len(party_profiles)),
+        "action": pa.array([type(action).__name__ for action in actions], pa.string()),
+        "actor": pa.array([action.getActor().getName() for action in actions], pa.string()),
+        "bid_id": pa.array(bid_ids, mask=~has_bid),
+    }
+    for party_id, cached_profile in zip(party_profiles, cached_profiles):
+        position = party_id.getName().split("_")[-1]
+        utilities = np.where(has_bid, cached_profile.utilities[bid_ids], np.nan)
+        columns[f"utility_{position}"] = pa.array(utilities)
+
+    return pa.table(columns)
+
+
+def write_actions(results_class: SAOPState, session_id: str, actions_file: Path):
+    """Write the actions of a session to a compressed parquet file."""
+    _require_pyarrow()
+    actions_file = Path(actions_file)
+    actions_file.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(
+        get_actions_table(results_class, session_id), actions_file, compression=COMPRESSION
+    )
+
+
+def write_sessions(session_ids: list, tournament_results: list, sessions_file: Path):
+    """Write the session summaries to a compressed parquet file, one row per session.
+
+    Args:
+        session_ids (list): ids of the sessions, the same as in the actions files
+        tournament_results (list): session summaries
+        sessions_file (Path): file to write to
+    """
+    _require_pyarrow()
+    sessions = pd.DataFrame(tournament_results)
+    sessions.insert(0, "session_id", session_ids)
+    # nested entries (e.g. the failure reason) are stored as JSON strings
+    for column in sessions.columns:
+        if sessions[column].map(lambda x: isinstance(x, dict)).any():
+            sessions[column] = sessions[column].map(
+                lambda x: json.dumps(x) if isinstance(x, dict) else None
+            )
+
+    pq.write_table(
+        pa.Table.from_pandas(sessions, preserve_index=False),
+        sessions_file,
+        compression=COMPRESSION,
+    )
+
+
+def open_actions_dataset(directory: Path) -> "ds.Dataset":
+    """Open the actions of all sessions as one dataset that is read lazily."""
+    _require_pyarrow()
+    return ds.dataset(Path(directory, "actions"), format="parquet")
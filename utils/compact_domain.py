@@ -0,0 +1,157 @@
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from utils.bid_encoding import decode_bid_ids, encode_bid_ids, sort_issues
+
+# Compact binary sidecar of a domain directory, next to the JSON files that stay canonical:
+#   magic (8 bytes), header length (uint64), JSON header, arrays aligned to ALIGNMENT bytes.
+# The header holds the issue and value tables (issues sorted by name) and the dtype, shape and
+# offset of every array, so the arrays can be memory mapped without copying. Arrays:
+#   weights_<profile>            float32 (num_issues,) issue weights
+#   value_utilities_<profile>    float32 (num_values,) value utilities of all issues, concatenated
+#   value_offsets                int64 (num_issues + 1,) start of the values of every issue
+#   pareto_bid_ids               int64 bid ids of the Pareto front, sorted on utility of the first profile
+# Bid ids are encoded as in `utils.bid_encoding`, the same ids as `utils.bid_space.BidSpace`.
+COMPACT_FILE = "compact.bin"
+# version 2: issues sorted by name, see `utils.bid_encoding`
+MAGIC = b"ANLDOM02"
+ALIGNMENT = 64
+
+
+def write_compact_domain(
+    path: str,
+    issues_values: List[tuple],
+    profiles: Dict[str, tuple],
+    pareto_bids: List[Dict[str, str]],
+):
+    """Write the compact binary sidecar of a domain.
+
+    Args:
+        path (str): file to write to
+        issues_values (List[tuple]): (issue, values) tuples of the domain
+        profiles (Dict[str, tuple]): (issue weights, value weights) dicts by profile name
+        pareto_bids (List[Dict[str, str]]): bids of the Pareto front
+    """
+    issues_values = dict(issues_values)
+    issues = sort_issues(issues_values)
+    values = [list(issues_values[issue]) for issue in issues]
+
+    value_ids = [{v: i for i, v in enumerate(vs)} for vs in values]
+    pareto_value_indices = [
+        [ids[bid[issue]] for issue, ids in zip(issues, value_ids)] for bid in pareto_bids
+    ]
+    arrays = {
+        "value_offsets": np.cumsum([0] + [len(v) for v in values]).astype(np.int64),
+        "pareto_bid_ids": encode_bid_ids(pareto_value_indices, [len(v) for v in values]),
+    }
+    for name, (issue_weights, value_weights) in profiles.items():
+        arrays[f"weights_{name}"] = np.array(
+            [issue_weights[issue] for issue in issues], dtype=np.float32
+        )
+        arrays[f"value_utilities_{name}"] = np.array(
+            [value_weights[issue][v] for issue, vs in zip(issues, values) for v in vs],
+            dtype=np.float32,
+        )
+
+    # the offsets depend on the header length, so the header is built with relative offsets
+    array_headers = {}
+    offset = 0
+    for name, array in arrays.items():
+        array_headers[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+    header = json.dumps(
+        {"issues": issues, "values": values, "profiles": list(profiles), "arrays": array_headers}
+    ).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + array_headers[name]["offset"])
+            f.write(array.tobytes())
+
+
+class CompactDomain:
+    """Domain and profiles read from the compact binary sidecar. The arrays are memory
+    mapped, so loading does not parse or copy the data.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a compact domain file")
+            header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(header_length))
+        data_start = _align(len(MAGIC) + 8 + header_length)
+
+        self.issues: List[str] = header["issues"]
+        self.values: List[List[str]] = header["values"]
+        self.profiles: List[str] = header["profiles"]
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, array_header in header["arrays"].items():
+            shape = tuple(array_header["shape"])
+            if np.prod(shape) == 0:
+                self.arrays[name] = np.zeros(shape, dtype=array_header["dtype"])
+                continue
+            self.arrays[name] = np.memmap(
+                path,
+                dtype=array_header["dtype"],
+                mode="r",
+                offset=data_start + array_header["offset"],
+                shape=shape,
+            )
+
+        self.radices = np.array([len(v) for v in self.values], dtype=np.int64)
+
+    def get_size(self) -> int:
+        return int(np.prod(self.radices))
+
+    def get_weights(self, profile: str) -> np.ndarray:
+        return self.arrays[f"weights_{profile}"]
+
+    def get_value_utilities(self, profile: str) -> List[np.ndarray]:
+        """Per issue, the utilities of its values (views on the memory map)."""
+        offsets = self.arrays["value_offsets"]
+        value_utilities = self.arrays[f"value_utilities_{profile}"]
+        return [
+            value_utilities[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+    def get_value_indices(self, bid_ids: np.ndarray) -> np.ndarray:
+        return decode_bid_ids(bid_ids, self.radices)
+
+    def get_utilities(self, profile: str, bid_ids: np.ndarray) -> np.ndarray:
+        """Utility of bids for a profile."""
+        value_indices = self.get_value_indices(bid_ids)
+        weights = self.get_weights(profile)
+        utilities = np.zeros(len(value_indices))
+        for column, value_utilities in enumerate(self.get_value_utilities(profile)):
+            utilities += float(weights[column]) * value_utilities[value_indices[:, column]]
+        return utilities
+
+    def get_bid(self, bid_id: int) -> Dict[str, str]:
+        value_indices = self.get_value_indices([bid_id])[0]
+        return {
+            issue: values[index]
+            for issue, values, index in zip(self.issues, self.values, value_indices)
+        }
+
+    def get_pareto_bid_ids(self) -> np.ndarray:
+        return self.arrays["pareto_bid_ids"]
+
+
+def load_compact_domain(directory: str) -> CompactDomain:
+    return CompactDomain(os.path.join(directory, COMPACT_FILE))
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
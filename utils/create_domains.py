@@ -1,6 +1,11 @@
+import argparse
 import json
 import math
 import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from itertools import product
 from math import sqrt
 from random import randint
@@ -11,16 +16,157 @@ from typing import Iterable
 import numpy as np
 import plotly.graph_objects as go
 from numpy.random import dirichlet
+from scipy.spatial import cKDTree
+
+from utils.bid_encoding import decode_bid_ids
+from utils.compact_domain import COMPACT_FILE, write_compact_domain
+
+# Generates random domains with their profiles, specials and visualisations. Run it as a module from the root of the
+# repository, e.g. `python -m utils.create_domains --count 10 --workers 4 --seed 42`.
 
 NUM_DOMAINS_TO_GENERATE = 50
+# number of bids that is evaluated at once, bounds the memory use for large domains
+CHUNK_SIZE = 2**20
+# maximum number of bids in the scatter plot of a visualisation, larger domains are sampled
+MAX_SCATTER_POINTS = 20000
+VISUALISATION_FILE = "visualisation.pdf"
 
 
 def main():
-    for i in range(NUM_DOMAINS_TO_GENERATE):
-        domain = Domain.create_random(f"domain{i:03d}")
-        domain.calculate_specials()
-        domain.generate_visualisation()
-        domain.to_file("domains/")
+    parser = argparse.ArgumentParser(description="Generate random negotiation domains.")
+    parser.add_argument("--count", type=int, default=NUM_DOMAINS_TO_GENERATE, help="number of domains")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes")
+    parser.add_argument("--seed", type=int, default=None, help="seed to reproduce the domains")
+    parser.add_argument("--output", default="domains/", help="directory to write the domains to")
+    parser.add_argument("--min-size", type=int, default=200, help="minimum number of bids of a domain")
+    parser.add_argument("--max-size", type=int, default=10000, help="maximum number of bids of a domain")
+    parser.add_argument("--render-workers", type=int, default=1, help="number of processes for the visualisations")
+    parser.add_argument("--skip-visualisation", action="store_true", help="do not render the visualisations")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    print(f"Generating {args.count} domains with seed {seed}")
+
+    indices = range(args.count)
+    names = []
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for name in executor.map(
+                partial(
+                    generate_domain,
+                    seed=seed,
+                    parent_path=args.output,
+                    min_size=args.min_size,
+                    max_size=args.max_size,
+                ),
+                indices,
+            ):
+                print(f"Generated {name}")
+                names.append(name)
+    else:
+        for i in indices:
+            name = generate_domain(i, seed, args.output, args.min_size, args.max_size)
+            print(f"Generated {name}")
+            names.append(name)
+
+    if args.skip_visualisation:
+        return
+
+    # rendering is a separate stage with its own pool, it is slow compared to the numerical work
+    directories = [os.path.join(args.output, name) for name in names]
+    if args.render_workers > 1:
+        with ProcessPoolExecutor(max_workers=args.render_workers) as executor:
+            rendered = list(executor.map(render_visualisation, directories))
+    else:
+        rendered = [render_visualisation(directory) for directory in directories]
+    print(f"Rendered {sum(rendered)} visualisations, {len(rendered) - sum(rendered)} were up to date")
+
+
+def generate_domain(
+    index: int, seed: int, parent_path: str, min_size: int = 200, max_size: int = 10000
+) -> str:
+    """Generate a random domain and write it to a directory. The domain only depends on the
+    seed and its index, not on the other domains or the process that generates it.
+
+    Args:
+        index (int): index of the domain, determines the name of the domain
+        seed (int): seed of the batch of domains
+        parent_path (str): directory to write the domain to
+        min_size (int, optional): minimum number of bids. Defaults to 200.
+        max_size (int, optional): maximum number of bids. Defaults to 10000.
+
+    Returns:
+        str: name of the domain
+    """
+    domain_seed = int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+    random.seed(domain_seed)
+    np.random.seed(domain_seed)
+
+    domain = Domain.create_random(f"domain{index:03d}", min_size, max_size)
+    domain.calculate_specials()
+    domain.to_file(parent_path)
+
+    return domain.get_name()
+
+
+def render_visualisation(directory: str, force: bool = False) -> bool:
+    """Render the visualisation of a domain directory. Rendering is skipped if the
+    visualisation is newer than the profiles and specials.
+
+    Args:
+        directory (str): domain directory
+        force (bool, optional): also render an up to date visualisation. Defaults to False.
+
+    Returns:
+        bool: whether the visualisation was rendered
+    """
+    visualisation_path = os.path.join(directory, VISUALISATION_FILE)
+    sources = [
+        os.path.join(directory, file)
+        for file in ["profileA.json", "profileB.json", "specials.json"]
+    ]
+    if not force and os.path.exists(visualisation_path):
+        source_time = max(os.path.getmtime(f) for f in sources if os.path.exists(f))
+        if os.path.getmtime(visualisation_path) > source_time:
+            return False
+
+    domain = Domain.from_directory(directory)
+    domain.calculate_specials()
+    domain.generate_visualisation()
+    domain.write_visualisation(directory)
+
+    return True
+
+
+def pareto_positions(utilities: np.ndarray) -> np.ndarray:
+    """find the Pareto front by sorting on utility A and sweeping utility B. Bids that are
+    weakly dominated are dropped, of bids with equal utilities only the first is kept.
+
+    Args:
+        utilities (np.ndarray): (n, 2) utility matrix, see `Domain.get_utility_matrix`
+
+    Returns:
+        np.ndarray: positions of the Pareto bids in the matrix, sorted on utility A
+    """
+    # sort on utility A and then utility B, both descending. lexsort is stable so equal
+    # bids remain in their original order.
+    order = np.lexsort((-utilities[:, 1], -utilities[:, 0]))
+    utilities_B = utilities[order, 1]
+
+    # a bid is on the Pareto front if its utility B exceeds that of all bids before it
+    is_pareto = np.ones(len(order), dtype=bool)
+    is_pareto[1:] = utilities_B[1:] > np.maximum.accumulate(utilities_B)[:-1]
+    return order[is_pareto][::-1]
+
+
+def value_letters(index: int) -> str:
+    """Letters of a value name: A to Z, then AA, AB, etc. for issues with many values."""
+    letters = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = ascii_uppercase[remainder] + letters
+    return letters
 
 
 class Profile:
@@ -103,6 +249,24 @@ class Profile:
             self.issue_weights[i] * self.value_weights[i][v] for i, v in bid.items()
         )
 
+    def get_utilities(self, issues_values: list, value_indices: np.ndarray) -> np.ndarray:
+        """calculate the utility of many bids at once.
+
+        Args:
+            issues_values (list): list of (issue, values) tuples that defines the columns of value_indices
+            value_indices (np.ndarray): (n, num_issues) array with the index of the value of every issue of a bid
+
+        Returns:
+            np.ndarray: utility of every bid
+        """
+        utilities = np.zeros(len(value_indices))
+        for column, (issue, values) in enumerate(issues_values):
+            weighted_values = np.array(
+                [self.issue_weights[issue] * self.value_weights[issue][v] for v in values]
+            )
+            utilities += weighted_values[value_indices[:, column]]
+        return utilities
+
 
 class Domain:
     def __init__(
@@ -130,8 +294,8 @@ class Domain:
         self.visualisation = visualisation
 
     @classmethod
-    def create_random(cls, name):
-        domain_size = randint(200, 10000)
+    def create_random(cls, name, min_size: int = 200, max_size: int = 10000):
+        domain_size = randint(min_size, max_size)
 
         while True:
             num_issues = randint(4, 10)
@@ -145,7 +309,7 @@ class Domain:
 
         issuesValues = {}
         for issue, num_values in zip(issues, values_per_issue):
-            values = {"values": [f"value{x}" for x in ascii_uppercase[:num_values]]}
+            values = {"values": [f"value{value_letters(x)}" for x in range(num_values)]}
             issuesValues[f"issue{issue}"] = values
 
         domain = {"name": name, "issuesValues": issuesValues}
@@ -182,8 +346,8 @@ class Domain:
     def calculate_specials(self):
         if self.nash_bid:
             return False
-        self.pareto_front = self.get_pareto(list(self.iter_bids()))
-        self.distribution = self.get_distribution(self.iter_bids())
+        self.pareto_front = self.get_pareto()
+        self.distribution = self.get_distribution()
 
         SW_utility = 0
         nash_utility = 0
@@ -209,9 +373,17 @@ class Domain:
 
         return True
 
-    def generate_visualisation(self):
-        bid_utils = [self.get_utilities(bid) for bid in self.iter_bids()]
-        bid_utils = list(zip(*bid_utils))
+    def generate_visualisation(self, max_points: int = MAX_SCATTER_POINTS):
+        # plot a sample of the bids for large domains, the Pareto front is always complete
+        size = self.get_size()
+        if size > max_points:
+            rng = np.random.default_rng(0)
+            bid_ids = np.sort(rng.choice(size, max_points, replace=False))
+            bid_utils = self.get_utility_matrix(self.get_value_indices(bid_ids)).T
+            bids_name = f"bids (sample of {max_points})"
+        else:
+            bid_utils = self.get_utility_matrix().T
+            bids_name = "bids"
 
         fig = go.Figure()
 
@@ -220,7 +392,7 @@ class Domain:
                 x=bid_utils[0],
                 y=bid_utils[1],
                 mode="markers",
-                name="bids",
+                name=bids_name,
                 marker=dict(size=3),
             )
         )
@@ -268,7 +440,7 @@ class Domain:
 
         fig.update_layout(
             title=dict(
-                text=f"{self.get_name()}<br><sub>(size: {len(list(self.iter_bids()))}, opposition: {self.opposition:.4f}, distribution: {self.distribution:.4f})</sub>",
+                text=f"{self.get_name()}<br><sub>(size: {self.get_size()}, opposition: {self.opposition:.4f}, distribution: {self.distribution:.4f})</sub>",
                 x=0.5,
                 xanchor="center",
             )
@@ -277,9 +449,29 @@ class Domain:
         self.visualisation = fig
 
     def to_file(self, parent_path):
+        # write to a temporary directory first and move it in place, so that the domain
+        # directory is never partially written
+        os.makedirs(parent_path, exist_ok=True)
+        tmp_parent_path = tempfile.mkdtemp(dir=parent_path, prefix=".tmp-")
+        try:
+            self._write_files(tmp_parent_path)
+        except BaseException:
+            rmtree(tmp_parent_path)
+            raise
+
         path = os.path.join(parent_path, self.domain["name"])
+        old_path = None
         if os.path.exists(path):
-            rmtree(path)
+            old_path = tempfile.mkdtemp(dir=parent_path, prefix=".old-")
+            os.rename(path, os.path.join(old_path, self.domain["name"]))
+        os.rename(os.path.join(tmp_parent_path, self.domain["name"]), path)
+
+        rmtree(tmp_parent_path)
+        if old_path:
+            rmtree(old_path)
+
+    def _write_files(self, parent_path):
+        path = os.path.join(parent_path, self.domain["name"])
         os.makedirs(path)
 
         with open(os.path.join(path, f"{self.domain['name']}.json"), "w") as f:
@@ -292,7 +484,7 @@ class Domain:
                 f.write(
                     json.dumps(
                         {
-                            "size": len(list(self.iter_bids())),
+                            "size": self.get_size(),
                             "opposition": self.opposition,
                             "distribution": self.distribution,
                             "social_welfare": self.SW_bid,
@@ -304,10 +496,27 @@ class Domain:
                     )
                 )
 
+        # compact binary sidecar of the domain, profiles and Pareto front
+        pareto_bids = [pareto_bid["bid"] for pareto_bid in self.pareto_front or []]
+        write_compact_domain(
+            os.path.join(path, COMPACT_FILE),
+            self.get_issues_values_list(),
+            {
+                "profileA": (self.profile_A.issue_weights, self.profile_A.value_weights),
+                "profileB": (self.profile_B.issue_weights, self.profile_B.value_weights),
+            },
+            pareto_bids,
+        )
+
         if self.visualisation:
-            self.visualisation.write_image(
-                file=os.path.join(path, "visualisation.pdf"), scale=5
-            )
+            self.write_visualisation(path)
+
+    def write_visualisation(self, path):
+        # write to a temporary file first, so that an interrupted render is not up to date
+        visualisation_path = os.path.join(path, VISUALISATION_FILE)
+        tmp_path = f"{visualisation_path}.tmp"
+        self.visualisation.write_image(file=tmp_path, format="pdf", scale=5)
+        os.replace(tmp_path, visualisation_path)
 
     def iter_bids(self) -> Iterable:
         return iter(self)
@@ -315,53 +524,106 @@ class Domain:
     def get_utilities(self, bid):
         return self.profile_A.get_utility(bid), self.profile_B.get_utility(bid)
 
-    def get_pareto(self, all_bids: list):
-        pareto_front = []
-        # dominated_bids = set()
-        while True:
-            candidate_bid = all_bids.pop(0)
-            bid_nr = 0
-            dominated = False
-            while len(all_bids) != 0 and bid_nr < len(all_bids):
-                bid = all_bids[bid_nr]
-                if self._dominates(candidate_bid, bid):
-                    # If it is dominated remove the bid from all bids
-                    all_bids.pop(bid_nr)
-                    # dominated_bids.add(frozenset(bid.items()))
-                elif self._dominates(bid, candidate_bid):
-                    dominated = True
-                    # dominated_bids.add(frozenset(candidate_bid.items()))
-                    bid_nr += 1
-                else:
-                    bid_nr += 1
-
-            if not dominated:
-                # add the non-dominated bid to the Pareto frontier
-                pareto_front.append(
-                    {
-                        "bid": candidate_bid,
-                        "utility": [
-                            self.profile_A.get_utility(candidate_bid),
-                            self.profile_B.get_utility(candidate_bid),
-                        ],
-                    }
-                )
+    def get_issues_values_list(self) -> list:
+        return [(i, v["values"]) for i, v in self.domain["issuesValues"].items()]
 
-            if len(all_bids) == 0:
-                break
+    def get_size(self) -> int:
+        return math.prod(len(values) for _, values in self.get_issues_values_list())
 
-        pareto_front = sorted(pareto_front, key=lambda d: d["utility"][0])
+    def get_value_indices(self, bid_ids: np.ndarray = None) -> np.ndarray:
+        """(n, num_issues) array with the value index of every issue of bids. A bid id is the
+        position of the bid in `iter_bids`, which is a mixed radix number of the value indices
+        in the issue order of the domain (not the sorted order of `utils.bid_encoding`).
 
-        return pareto_front
+        Args:
+            bid_ids (np.ndarray, optional): bids to decode. Defaults to all bids.
+
+        Returns:
+            np.ndarray: value indices of the bids
+        """
+        if bid_ids is None:
+            bid_ids = np.arange(self.get_size(), dtype=np.int64)
+        radices = [len(values) for _, values in self.get_issues_values_list()]
+        return decode_bid_ids(bid_ids, radices)
+
+    def get_bid(self, value_indices) -> dict:
+        return {
+            issue: values[index]
+            for (issue, values), index in zip(self.get_issues_values_list(), value_indices)
+        }
+
+    def get_utility_matrix(self, value_indices: np.ndarray = None) -> np.ndarray:
+        """(n, 2) array with the utilities of profile A and B for all bids."""
+        if value_indices is None:
+            value_indices = self.get_value_indices()
+        issues_values = self.get_issues_values_list()
+        return np.column_stack(
+            [
+                self.profile_A.get_utilities(issues_values, value_indices),
+                self.profile_B.get_utilities(issues_values, value_indices),
+            ]
+        )
+
+    def iter_utility_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterable:
+        """Enumerate all bids in chunks, so that large domains fit in memory.
+
+        Args:
+            chunk_size (int, optional): number of bids per chunk. Defaults to CHUNK_SIZE.
 
-    def get_distribution(self, bids_iter) -> float:
-        min_distance_sum = 0.0
+        Yields:
+            Tuple[np.ndarray, np.ndarray]: bid ids and (n, 2) utility matrix of a chunk
+        """
+        size = self.get_size()
+        for start in range(0, size, chunk_size):
+            bid_ids = np.arange(start, min(start + chunk_size, size), dtype=np.int64)
+            yield bid_ids, self.get_utility_matrix(self.get_value_indices(bid_ids))
+
+    def get_pareto(self, chunk_size: int = CHUNK_SIZE) -> list:
+        """calculate the Pareto front. The front of every chunk of bids is merged with the
+        front of the chunks before it, so only the front is kept in memory.
+
+        Args:
+            chunk_size (int, optional): number of bids per chunk. Defaults to CHUNK_SIZE.
+
+        Returns:
+            list: Pareto bids and their utilities, sorted on utility A
+        """
+        pareto_ids = np.zeros(0, dtype=np.int64)
+        pareto_utilities = np.zeros((0, 2))
+        for bid_ids, utilities in self.iter_utility_chunks(chunk_size):
+            # the front bids have lower ids than the chunk, so the candidates are in bid order
+            candidate_ids = np.concatenate([pareto_ids, bid_ids])
+            candidate_utilities = np.concatenate([pareto_utilities, utilities])
+            positions = np.sort(pareto_positions(candidate_utilities))
+            pareto_ids = candidate_ids[positions]
+            pareto_utilities = candidate_utilities[positions]
+
+        order = pareto_positions(pareto_utilities)
+        value_indices = self.get_value_indices(pareto_ids[order])
+        pareto_front = [
+            {
+                "bid": self.get_bid(bid_value_indices),
+                "utility": [float(utility_A), float(utility_B)],
+            }
+            for bid_value_indices, (utility_A, utility_B) in zip(
+                value_indices, pareto_utilities[order]
+            )
+        ]
 
-        for i, bid in enumerate(bids_iter):
-            min_distance = self.distance_to_pareto(bid)
-            min_distance_sum += min_distance
+        return pareto_front
+
+    def get_distribution(self, chunk_size: int = CHUNK_SIZE) -> float:
+        if not self.pareto_front:
+            raise ValueError("Pareto front not calculated")
 
-        distribution = min_distance_sum / (i + 1)
+        # average distance of all bids to their nearest Pareto bid
+        pareto_utilities = np.array([bid["utility"] for bid in self.pareto_front])
+        tree = cKDTree(pareto_utilities)
+        total_distance = 0.0
+        for _, utilities in self.iter_utility_chunks(chunk_size):
+            min_distances, _ = tree.query(utilities)
+            total_distance += float(np.sum(min_distances))
+        distribution = total_distance / self.get_size()
 
         return distribution
 
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+from typing import List
+
+DOMAINS_DIR = Path("domains")
+INDEX_FILE = "index.json"
+# files of a domain directory that the metrics are derived from
+SOURCE_FILES = ("profileA.json", "profileB.json", "specials.json")
+
+
+class DomainIndex:
+    """Metrics of all domains in a directory (size, number of issues, opposition, distribution,
+    Nash, Kalai and social welfare utilities). The index is stored in the domains directory and
+    only the entries of domains that changed are recomputed.
+
+    Example: two domains of low and high opposition as profile sets of a tournament
+        index = DomainIndex.load()
+        domains = index.sample_stratified(2, "opposition", seed=SEED)
+        profile_sets = index.get_profile_sets(domains)
+    """
+
+    def __init__(self, domains_dir: Path = DOMAINS_DIR, entries: dict = None):
+        self.domains_dir = Path(domains_dir)
+        # entries by domain name
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, domains_dir: Path = DOMAINS_DIR, update: bool = True) -> "DomainIndex":
+        """Load the index of a domains directory.
+
+        Args:
+            domains_dir (Path, optional): directory with the domain directories. Defaults to DOMAINS_DIR.
+            update (bool, optional): update the entries of new and changed domains and save
+                the index. Defaults to True.
+
+        Returns:
+            DomainIndex: index of the domains
+        """
+        index_path = Path(domains_dir, INDEX_FILE)
+        entries = {}
+        if index_path.exists():
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+
+        index = cls(domains_dir, entries)
+        if update and index.update():
+            index.save()
+        return index
+
+    def update(self) -> bool:
+        """Add new domains, recompute changed domains and drop removed domains.
+
+        Returns:
+            bool: whether the index changed
+        """
+        changed = False
+        names = set()
+        for directory in sorted(self.domains_dir.iterdir()):
+            if not directory.joinpath("profileA.json").exists():
+                continue
+            names.add(directory.name)
+
+            entry = self.entries.get(directory.name)
+            stats = get_source_stats(directory)
+            # the hash is only recomputed if a file was modified
+            if entry is not None and entry["source_stats"] == stats:
+                continue
+            content_hash = get_content_hash(directory)
+            if entry is not None and entry["hash"] == content_hash:
+                entry["source_stats"] = stats
+            else:
+                self.entries[directory.name] = create_entry(directory, content_hash, stats)
+            changed = True
+
+        for name in set(self.entries) - names:
+            del self.entries[name]
+            changed = True
+
+        return changed
+
+    def save(self):
+        # write to a temporary file first and move it in place, readers never see a partial index
+        index_path = self.domains_dir.joinpath(INDEX_FILE)
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, index_path)
+
+    def query(self, **ranges) -> List[dict]:
+        """Domains with metrics within the given ranges, e.g. `query(size=(1000, 5000))`.
+        A bound of None is open. Domains without the metric are excluded.
+
+        Returns:
+            List[dict]: index entries, sorted on name
+        """
+        entries = []
+        for name in sorted(self.entries):
+            entry = self.entries[name]
+            for metric, (lower, upper) in ranges.items():
+                value = entry.get(metric)
+                if value is None:
+                    break
+                if (lower is not None and value < lower) or (upper is not None and value > upper):
+                    break
+            else:
+                entries.append(entry)
+        return entries
+
+    def sample_stratified(
+        self, num_domains: int, metric: str, seed: int = None, entries: List[dict] = None
+    ) -> List[dict]:
+        """Sample domains that cover the range of a metric. The domains are sorted on the
+        metric and split into `num_domains` strata of equal size, one domain is drawn from
+        every stratum.
+
+        Args:
+            num_domains (int): number of domains to sample
+            metric (str): metric to stratify on, e.g. "opposition" or "size"
+            seed (int, optional): seed of the sample. Defaults to None.
+            entries (List[dict], optional): entries to sample from, e.g. the result of
+                `query`. Defaults to all domains.
+
+        Returns:
+            List[dict]: index entries, sorted on the metric
+        """
+        if entries is None:
+            entries = list(self.entries.values())
+        entries = sorted(
+            (e for e in entries if e.get(metric) is not None),
+            key=lambda e: (e[metric], e["name"]),
+        )
+        if num_domains > len(entries):
+            raise ValueError(f"Cannot sample {num_domains} domains from {len(entries)} domains")
+
+        rng = random.Random(seed)
+        sample = []
+        for i in range(num_domains):
+            start = i * len(entries) // num_domains
+            end = (i + 1) * len(entries) // num_domains
+            sample.append(entries[rng.randrange(start, end)])
+        return sample
+
+    def get_profile_sets(self, entries: List[dict]) -> List[List[str]]:
+        """Profile sets of domains, in the format of the tournament settings."""
+        return [
+            [
+                self.domains_dir.joinpath(entry["name"], "profileA.json").as_posix(),
+                self.domains_dir.joinpath(entry["name"], "profileB.json").as_posix(),
+            ]
+            for entry in entries
+        ]
+
+
+def get_source_stats(directory: Path) -> list:
+    stats = []
+    for file in SOURCE_FILES:
+        path = directory.joinpath(file)
+        if path.exists():
+            stat = path.stat()
+            stats.append([file, stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def get_content_hash(directory: Path) -> str:
+    content_hash = hashlib.sha256()
+    for file in SOURCE_FILES:
+        path = directory.joinpath(file)
+        if path.exists():
+            content_hash.update(file.encode("utf-8"))
+            content_hash.update(path.read_bytes())
+    return content_hash.hexdigest()
+
+
+def create_entry(directory: Path, content_hash: str, stats: list) -> dict:
+    with open(directory.joinpath("profileA.json"), "r", encoding="utf-8") as f:
+        profile = json.load(f)["LinearAdditiveUtilitySpace"]
+    issues_values = profile["domain"]["issuesValues"]
+
+    size = 1
+    for values in issues_values.values():
+        size *= len(values["values"])
+
+    entry = {
+        "name": directory.name,
+        "size": size,
+        "num_issues": len(issues_values),
+        "opposition": None,
+        "distribution": None,
+        "pareto_size": None,
+        "nash_utility": None,
+        "kalai_utility": None,
+        "social_welfare_utility": None,
+        "hash": content_hash,
+        "source_stats": stats,
+    }
+
+    # metrics of the Pareto front, only available if the specials were calculated
+    specials_path = directory.joinpath("specials.json")
+    if specials_path.exists():
+        with open(specials_path, "r", encoding="utf-8") as f:
+            specials = json.load(f)
+        entry["opposition"] = specials["opposition"]
+        entry["distribution"] = specials["distribution"]
+        entry["pareto_size"] = len(specials["pareto_front"])
+        entry["nash_utility"] = specials["nash"]["utility"]
+        entry["kalai_utility"] = specials["kalai"]["utility"]
+        entry["social_welfare_utility"] = specials["social_welfare"]["utility"]
+
+    return entry
+
+
+if __name__ == "__main__":
+    index = DomainIndex.load()
+    print(f"Indexed {len(index.entries)} domains in {index.domains_dir.joinpath(INDEX_FILE)}")
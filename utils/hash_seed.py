@@ -0,0 +1,34 @@
+import os
+import sys
+
+# hash seed of the tournament scripts. The hashes of strings are randomised per process by default, which changes the
+# iteration order of sets, e.g. of the issues of a domain, and with it the bids that agents draw at random.
+HASH_SEED = "0"
+
+
+def get_hash_seed() -> str:
+    """PYTHONHASHSEED of the running process, None if the hashes are randomised."""
+    hash_seed = os.environ.get("PYTHONHASHSEED")
+    return hash_seed if hash_seed is not None and hash_seed.isdigit() else None
+
+
+def pin_hash_seed(hash_seed: str = None):
+    """Re-execute the running script with a fixed PYTHONHASHSEED, unless it already runs with one.
+    Worker and session processes inherit the hash seed, so that sessions with the same seed can be
+    reproduced in another process.
+
+    Args:
+        hash_seed (str, optional): hash seed to run with. Defaults to the PYTHONHASHSEED that is
+            set or else HASH_SEED.
+    """
+    if hash_seed is None:
+        hash_seed = get_hash_seed() or HASH_SEED
+    hash_seed = str(hash_seed)
+    if get_hash_seed() == hash_seed:
+        return
+
+    os.environ["PYTHONHASHSEED"] = hash_seed
+    sys.stdout.flush()
+    # orig_argv also covers scripts that are run as a module (python -m)
+    argv = getattr(sys, "orig_argv", None) or [sys.executable] + sys.argv
+    os.execv(sys.executable, [sys.executable] + argv[1:])
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from geniusweb.profile.Profile import Profile
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from geniusweb.profileconnection.ProfileConnectionFactory import ProfileConnectionFactory
+from pyson.ObjectMapper import ObjectMapper
+from tudelft_utilities_logging.Reporter import Reporter
+from tudelft_utilities_logging.ReportToLogger import ReportToLogger
+from uri.uri import URI
+
+from utils.bid_space import BidSpace
+
+CACHE_DIR = Path("cache", "profiles")
+# number of bids of which the utilities are calculated at once
+CHUNK_SIZE = 2**20
+
+
+class CachedProfile:
+    """Parsed profile together with the precomputed utilities of all bids. The arrays are
+    read-only memory maps, so sessions running in parallel on a host share the pages.
+    """
+
+    def __init__(
+        self,
+        profile: LinearAdditive,
+        utilities: np.ndarray,
+    ):
+        self.profile = profile
+        self.bid_space = BidSpace(profile.getDomain())
+        # utility of every bid id
+        self.utilities = utilities
+
+
+def load_profile(
+    profile_uri, cache_dir: Path = CACHE_DIR, reporter: Reporter = None
+) -> CachedProfile:
+    """Load a profile from the cache, the cache entry is created if it does not exist yet.
+
+    Args:
+        profile_uri: file path or uri of the profile. Profiles that are not a file, e.g. of a
+            profile server, are obtained through a `ProfileConnectionFactory` connection.
+        cache_dir (Path, optional): directory of the cache. Defaults to CACHE_DIR.
+        reporter (Reporter, optional): reporter of the profile connection. Defaults to a
+            logger.
+
+    Returns:
+        CachedProfile: parsed profile and precomputed utilities
+    """
+    content = _read_profile(str(profile_uri), reporter)
+
+    # entries are keyed by the content of the profile, so changed profiles get a new entry
+    entry_dir = Path(cache_dir, hashlib.sha256(content).hexdigest())
+    if not entry_dir.exists():
+        _write_entry(entry_dir, content)
+
+    return _read_entry(str(entry_dir))
+
+
+def _read_profile(profile_uri: str, reporter: Reporter = None) -> bytes:
+    if profile_uri.startswith("file:") or "://" not in profile_uri:
+        return Path(profile_uri.split("file:")[-1]).read_bytes()
+
+    if reporter is None:
+        reporter = ReportToLogger("profile_cache")
+    profile_connection = ProfileConnectionFactory.create(URI(profile_uri), reporter)
+    try:
+        profile = profile_connection.getProfile()
+    finally:
+        profile_connection.close()
+
+    return json.dumps(ObjectMapper().toJson(profile)).encode("utf-8")
+
+
+def _write_entry(entry_dir: Path, content: bytes):
+    profile = ObjectMapper().parse(json.loads(content), Profile)
+    assert isinstance(profile, LinearAdditive)
+
+    # evaluate the bids in chunks, the value indices of all bids at once do not fit in
+    # memory for large domains
+    bid_space = BidSpace(profile.getDomain())
+    utility_tables = bid_space.get_utility_tables(profile)
+    utilities = np.empty(bid_space.size)
+    for start in range(0, bid_space.size, CHUNK_SIZE):
+        end = min(start + CHUNK_SIZE, bid_space.size)
+        utilities[start:end] = bid_space.evaluate(
+            utility_tables, np.arange(start, end, dtype=np.int64)
+        )
+
+    # write to a temporary directory first and move it in place, so that parallel
+    # sessions never read a partially written entry
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=entry_dir.parent))
+    with open(tmp_dir.joinpath("profile.pkl"), "wb") as f:
+        pickle.dump(profile, f)
+    np.save(tmp_dir.joinpath("utilities.npy"), utilities)
+
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # another process created the entry in the meantime
+        shutil.rmtree(tmp_dir)
+
+
+@lru_cache(maxsize=None)
+def _read_entry(entry_dir: str) -> CachedProfile:
+    with open(os.path.join(entry_dir, "profile.pkl"), "rb") as f:
+        profile = pickle.load(f)
+    utilities = np.load(os.path.join(entry_dir, "utilities.npy"), mmap_mode="r")
+
+    return CachedProfile(profile, utilities)
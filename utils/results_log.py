@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+
+def session_key(settings: dict, repetition: int = 0) -> str:
+    """Key that identifies a session of a tournament by its agents, profiles, deadline and
+    repetition.
+    """
+    description = json.dumps([settings, repetition], sort_keys=True)
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+def tournament_id(session_keys: List[str]) -> str:
+    """Id of a tournament, derived from the keys of all its sessions, so that the shards of a
+    tournament get the same id without coordination.
+    """
+    return hashlib.sha1("".join(session_keys).encode("utf-8")).hexdigest()
+
+
+def session_seed(tournament_seed: int, settings: dict, repetition: int = 0) -> int:
+    """Derive the random seed of a session from the seed of the tournament, so that every
+    session gets a different but reproducible seed.
+    """
+    description = json.dumps([tournament_seed, settings, repetition], sort_keys=True)
+    # 32 bits, the range that numpy accepts as seed
+    return int(hashlib.sha256(description.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class ResultsLog:
+    """Append-only log of session summaries (JSON lines). Every summary is flushed to disk
+    as soon as its session finished, so a tournament that is interrupted can be resumed
+    by skipping the sessions that are already in the log.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def read(self) -> Dict[str, dict]:
+        """Read the summaries of all completed sessions.
+
+        Returns:
+            Dict[str, dict]: session summaries by session key
+        """
+        return {entry["key"]: entry["summary"] for entry in self.read_entries()}
+
+    def read_entries(self) -> List[dict]:
+        """Read all entries of the log, every entry has a key, settings and summary and the
+        id of the tournament and position of the session in it (missing in logs of older
+        versions).
+        """
+        entries = []
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # the last line can be incomplete if the process was killed while writing
+                    continue
+
+        return entries
+
+    def append(
+        self,
+        key: str,
+        settings: dict,
+        summary: dict,
+        position: int = None,
+        tournament: str = None,
+    ):
+        """Append the summary of a completed session.
+
+        Args:
+            key (str): key of the session, see `session_key`
+            settings (dict): session settings
+            summary (dict): summary of the session results
+            position (int, optional): position of the session in the (unsharded) session list
+                of the tournament, used to restore the session order. Defaults to None.
+            tournament (str, optional): id of the tournament, see `tournament_id`. Defaults
+                to None.
+        """
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True)
+
+        entry = {"key": key, "settings": settings, "summary": summary}
+        if position is not None:
+            entry["position"] = position
+        if tournament is not None:
+            entry["tournament"] = tournament
+        line = json.dumps(entry) + "\n"
+        # start on a new line if the log ends with an incomplete line
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
@@ -1,39 +1,124 @@
+import multiprocessing
+import random
 import shutil
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from itertools import permutations
-from math import factorial, prod
+from math import prod
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
+from geniusweb.actions.Accept import Accept
+from geniusweb.actions.Offer import Offer
+from geniusweb.deadline.Deadline import Deadline
+from geniusweb.deadline.DeadlineRounds import DeadlineRounds
+from geniusweb.deadline.DeadlineTime import DeadlineTime
 from geniusweb.profile.utilityspace.LinearAdditiveUtilitySpace import (
     LinearAdditiveUtilitySpace,
 )
-from geniusweb.profileconnection.ProfileConnectionFactory import (
-    ProfileConnectionFactory,
-)
-from geniusweb.protocol.NegoSettings import NegoSettings
+from geniusweb.protocol.session.TeamInfo import TeamInfo
+from geniusweb.protocol.session.saop.SAOPSettings import SAOPSettings
 from geniusweb.protocol.session.saop.SAOPState import SAOPState
+from geniusweb.references.Parameters import Parameters
+from geniusweb.references.PartyRef import PartyRef
+from geniusweb.references.PartyWithParameters import PartyWithParameters
+from geniusweb.references.PartyWithProfile import PartyWithProfile
+from geniusweb.references.ProfileRef import ProfileRef
 from geniusweb.simplerunner.ClassPathConnectionFactory import ClassPathConnectionFactory
 from geniusweb.simplerunner.NegoRunner import StdOutReporter
 from geniusweb.simplerunner.Runner import Runner
 from pyson.ObjectMapper import ObjectMapper
 from uri.uri import URI
 
-from utils.ask_proceed import ask_proceed
+from utils.agent_imports import import_agent_classes
+from utils.columnar import write_actions, write_sessions
+from utils.hash_seed import get_hash_seed
+from utils.profile_cache import load_profile
+from utils.results_log import ResultsLog, session_key, session_seed, tournament_id
+from utils.session_watchdog import run_session_isolated
+from utils.tournament_aggregator import TournamentAggregator
+from utils.tournament_planner import AgentHistory, plan_sessions
+from utils.virtual_clock import (
+    RoundsClock,
+    VirtualClock,
+    VirtualClockConnectionFactory,
+)
 
+# session settings keys that determine the deadline, these are passed on by run_tournament
+DEADLINE_KEYS = ("deadline_time_ms", "deadline_rounds", "virtual_turn_ms")
+
+
+def run_session(
+    settings,
+    trace: bool = True,
+    annotate: bool = True,
+    actions_file: Path = None,
+    session_id: str = "",
+) -> Tuple[dict, dict]:
+    """Run a single negotiation session.
+
+    Args:
+        settings (dict): agents, profiles and deadline of the session.
+        trace (bool, optional): also return the trace of the session. Serialising the
+            session state to a trace is relatively slow, without it only the summary is
+            created. Defaults to True.
+        annotate (bool, optional): add the utilities of both parties to every offer in the
+            trace. Defaults to True.
+        actions_file (Path, optional): write the actions of the session to this parquet
+            file, see `utils.columnar`. Defaults to None.
+        session_id (str, optional): id of the session in the actions file. Defaults to "".
+
+    Returns:
+        Tuple[dict, dict]: trace (None if not requested) and summary of the session.
+    """
+    seed = settings.get("seed")
+    if seed is not None:
+        # seed before the agents are instantiated. Together with a virtual clock or round
+        # deadline and a fixed hash seed (see `utils.hash_seed`), this makes the session
+        # reproducible.
+        random.seed(seed)
+        np.random.seed(seed)
 
-def run_session(settings) -> Tuple[dict, dict]:
     agents = settings["agents"]
     profiles = settings["profiles"]
-    deadline_time_ms = settings["deadline_time_ms"]
+    deadline_time_ms = settings.get("deadline_time_ms")
+    deadline_rounds = settings.get("deadline_rounds")
+    virtual_turn_ms = settings.get("virtual_turn_ms")
+
+    # a round based deadline also requires a time limit, default to 60 seconds
+    if deadline_rounds is not None and deadline_time_ms is None:
+        deadline_time_ms = 60000
 
     # quick and dirty checks
     assert isinstance(agents, list) and len(agents) == 2
     assert isinstance(profiles, list) and len(profiles) == 2
     assert isinstance(deadline_time_ms, int) and deadline_time_ms > 0
+    assert deadline_rounds is None or virtual_turn_ms is None
     assert all(["class" in agent for agent in agents])
 
+    if deadline_rounds is not None:
+        # the session ends after a number of rounds. The agents receive a progress
+        # object that follows the rounds of the session.
+        assert isinstance(deadline_rounds, int) and deadline_rounds > 0
+        deadline = DeadlineRounds(deadline_rounds, deadline_time_ms)
+        connection_factory = VirtualClockConnectionFactory(
+            RoundsClock(deadline_rounds, deadline_time_ms)
+        )
+    elif virtual_turn_ms is not None:
+        # run the session on a virtual clock that advances by a fixed cost per action
+        # instead of the wall-clock. The wall-clock deadline still bounds the session.
+        assert isinstance(virtual_turn_ms, int) and virtual_turn_ms > 0
+        clock = VirtualClock(deadline_time_ms, virtual_turn_ms)
+        deadline = DeadlineRounds(clock.num_rounds(), deadline_time_ms)
+        connection_factory = VirtualClockConnectionFactory(clock)
+    else:
+        deadline = DeadlineTime(deadline_time_ms)
+        connection_factory = ClassPathConnectionFactory()
+
     for agent in agents:
         if "parameters" in agent:
             if "storage_dir" in agent["parameters"]:
@@ -41,111 +126,340 @@ def run_session(settings) -> Tuple[dict, dict]:
                 if not storage_dir.exists():
                     storage_dir.mkdir(parents=True)
 
-    # file path to uri
-    profiles_uri = [f"file:{x}" for x in profiles]
-
-    # create full settings dictionary that geniusweb requires
-    settings_full = {
-        "SAOPSettings": {
-            "participants": [
-                {
-                    "TeamInfo": {
-                        "parties": [
-                            {
-                                "party": {
-                                    "partyref": f"pythonpath:{agents[0]['class']}",
-                                    "parameters": agents[0]["parameters"]
-                                    if "parameters" in agents[0]
-                                    else {},
-                                },
-                                "profile": profiles_uri[0],
-                            }
-                        ]
-                    }
-                },
-                {
-                    "TeamInfo": {
-                        "parties": [
-                            {
-                                "party": {
-                                    "partyref": f"pythonpath:{agents[1]['class']}",
-                                    "parameters": agents[1]["parameters"]
-                                    if "parameters" in agents[1]
-                                    else {},
-                                },
-                                "profile": profiles_uri[1],
-                            }
-                        ]
-                    }
-                },
-            ],
-            # "deadline": {"DeadlineRounds": {"rounds": rounds, "durationms": 60000}},
-            "deadline": {"DeadlineTime": {"durationms": deadline_time_ms}},
-        }
-    }
-
-    # parse settings dict to settings object
-    settings_obj = ObjectMapper().parse(settings_full, NegoSettings)
+    # create the settings object that geniusweb requires
+    settings_obj = create_saop_settings(agents, profiles, deadline)
 
     # create the negotiation session runner object
-    runner = Runner(settings_obj, ClassPathConnectionFactory(), StdOutReporter(), 0)
+    runner = Runner(settings_obj, connection_factory, StdOutReporter(), 0)
 
     # run the negotiation session
     runner.run()
 
-    # get results from the session in class format and dict format
+    # get results from the session in class format
     results_class: SAOPState = runner.getProtocol().getState()
-    results_dict: dict = ObjectMapper().toJson(results_class)["SAOPState"]
 
-    # add utilities to the results and create a summary
-    results_trace, results_summary = process_results(results_class, results_dict)
+    if actions_file is not None:
+        write_actions(results_class, session_id, actions_file)
+
+    if not trace:
+        # summary straight from the actions, without serialising the state
+        results_trace, results_summary = None, summarize_state(results_class)
+    else:
+        # add utilities to the results in dict format and create a summary
+        results_dict: dict = ObjectMapper().toJson(results_class)["SAOPState"]
+        results_trace, results_summary = process_results(
+            results_class, results_dict, annotate
+        )
+
+    if seed is not None:
+        results_summary["seed"] = seed
+        results_summary["hash_seed"] = get_hash_seed()
 
     return results_trace, results_summary
 
 
-def run_tournament(tournament_settings: dict) -> Tuple[list, list]:
+def create_saop_settings(agents: list, profiles: list, deadline: Deadline) -> SAOPSettings:
+    """Create the SAOP settings object of a session directly, instead of parsing a dict.
+
+    Args:
+        agents (list): settings of the 2 agents, with the class path under "class" and
+            optionally "parameters".
+        profiles (list): file paths of the profiles of the agents.
+        deadline (Deadline): deadline of the session.
+
+    Returns:
+        SAOPSettings: settings of the session.
+    """
+    participants = []
+    for agent, profile in zip(agents, profiles):
+        party = PartyWithParameters(
+            PartyRef(URI(f"pythonpath:{agent['class']}")),
+            Parameters(agent.get("parameters", {})),
+        )
+        party_with_profile = PartyWithProfile(party, ProfileRef(URI(f"file:{profile}")))
+        participants.append(TeamInfo([party_with_profile]))
+
+    return SAOPSettings(participants, deadline)
+
+
+def run_tournament(
+    tournament_settings: dict,
+    workers: int = 1,
+    results_log=None,
+    leaderboard=None,
+    columnar_dir=None,
+    shard_index: int = 0,
+    num_shards: int = 1,
+    max_cost: float = None,
+    history: list = (),
+) -> Tuple[list, list, pd.DataFrame]:
+    """Run every agent against every other agent on both sides of every profile set.
+
+    Args:
+        tournament_settings (dict): agents, profile sets and deadline of the tournament.
+        workers (int, optional): number of processes to run sessions in. Sessions are
+            independent, so with more than 1 worker they are distributed over a process
+            pool. Results are always returned in the same session order as a serial run.
+            Defaults to 1.
+        results_log (optional): path of a JSON lines file that every session summary is
+            appended to as soon as the session finished. Sessions that are already in the
+            log are not run again, so an interrupted tournament is resumed by passing the
+            same log. Defaults to None.
+        leaderboard (optional): path of a csv file with the tournament summary so far,
+            it is updated after every session. Defaults to None.
+        columnar_dir (optional): directory to write the actions and summaries of the
+            sessions to as parquet files, see `utils.columnar`. Defaults to None.
+        shard_index (int, optional): index of the part of the tournament to run.
+            Defaults to 0.
+        num_shards (int, optional): number of parts the tournament is split into, every
+            shard runs every `num_shards`-th session. The shards can run on different
+            hosts, their results logs are combined with `merge_results_logs`. Defaults to 1.
+        max_cost (float, optional): budget of the tournament in seconds of wall-clock time.
+            The tournament is not started if its estimated duration exceeds the budget.
+            Defaults to None (no budget).
+        history (list, optional): results logs of previous tournaments, used to estimate
+            the duration of the sessions, see `utils.tournament_planner`. Defaults to ().
+
+    Returns:
+        Tuple[list, list, pd.DataFrame]: session settings, session summaries and the
+            tournament summary.
+    """
     # create agent permutations, ensures that every agent plays against every other agent on both sides of a profile set.
     agents = tournament_settings["agents"]
     profile_sets = tournament_settings["profile_sets"]
-    deadline_time_ms = tournament_settings["deadline_time_ms"]
+    repetitions = tournament_settings.get("repetitions", 1)
+    session_limits = tournament_settings.get("session_limits")
+    tournament_seed = tournament_settings.get("seed")
+
+    assert 0 <= shard_index < num_shards
 
-    num_sessions = (factorial(len(agents)) // factorial(len(agents) - 2)) * len(
-        profile_sets
+    tournament_steps = []
+    session_keys = []
+    for repetition in range(repetitions):
+        for profiles in profile_sets:
+            # quick an dirty check
+            assert isinstance(profiles, list) and len(profiles) == 2
+            for agent_duo in permutations(agents, 2):
+                # create session settings dict
+                settings = {"agents": list(agent_duo), "profiles": profiles}
+                for key in DEADLINE_KEYS:
+                    if key in tournament_settings:
+                        settings[key] = tournament_settings[key]
+                if tournament_seed is not None:
+                    settings["seed"] = session_seed(tournament_seed, settings, repetition)
+                tournament_steps.append(settings)
+                session_keys.append(session_key(settings, repetition))
+
+    # deterministic partition of the sessions, the session order is the same on every host.
+    # The tournament id and position of a session are logged to restore the order on merging
+    tournament = tournament_id(session_keys)
+    session_positions = dict(zip(session_keys, range(len(session_keys))))
+    tournament_steps = tournament_steps[shard_index::num_shards]
+    session_keys = session_keys[shard_index::num_shards]
+
+    # skip the sessions that were completed by an earlier (interrupted) run
+    results_log = ResultsLog(results_log) if results_log is not None else None
+    completed = results_log.read() if results_log is not None else {}
+    pending = [
+        (key, settings)
+        for key, settings in zip(session_keys, tournament_steps)
+        if key not in completed
+    ]
+    if len(pending) < len(tournament_steps):
+        num_completed = len(tournament_steps) - len(pending)
+        print(f"Resuming tournament, {num_completed} sessions already completed")
+
+    # the leaderboard so far is aggregated while the tournament is running
+    aggregator = TournamentAggregator()
+    for key in session_keys:
+        if key in completed:
+            aggregator.add(completed[key])
+
+    # estimate the duration of the tournament and run the longest sessions first
+    pending, total_cost = plan_sessions(pending, AgentHistory(history))
+    estimated_duration = total_cost / max(min(workers, len(pending)), 1)
+    print(
+        f"Running {len(pending)} negotiation sessions, "
+        f"estimated duration {estimated_duration:.0f} s on {workers} worker(s)"
     )
-    if num_sessions > 100:
-        message = (
-            f"WARNING: this would run {num_sessions} negotiation sessions. Proceed?"
+    if max_cost is not None and estimated_duration > max_cost:
+        raise RuntimeError(
+            f"Estimated duration of {estimated_duration:.0f} s exceeds the budget of {max_cost:.0f} s"
         )
-        if not ask_proceed(message):
-            print("Exiting script")
-            exit()
 
-    tournament_results = []
-    tournament_steps = []
-    for profiles in profile_sets:
-        # quick an dirty check
-        assert isinstance(profiles, list) and len(profiles) == 2
-        for agent_duo in permutations(agents, 2):
-            # create session settings dict
-            settings = {
-                "agents": list(agent_duo),
-                "profiles": profiles,
-                "deadline_time_ms": deadline_time_ms,
-            }
+    # import the agent classes once, worker processes are forked from this process and
+    # inherit the imported modules
+    import_time = import_agent_classes(agents)
+    print(f"Imported agent classes in {import_time:.2f} s")
+
+    # run the negotiation sessions, the summaries are logged in order of completion
+    session_import_time = 0.0
+    for key, settings, results_summary in run_sessions(
+        pending, workers, session_limits, columnar_dir
+    ):
+        session_import_time += results_summary.get("import_time_s", 0.0)
+        completed[key] = results_summary
+        aggregator.add(results_summary)
+        if results_log is not None:
+            results_log.append(
+                key, settings, results_summary, session_positions[key], tournament
+            )
+        if leaderboard is not None:
+            aggregator.to_csv(leaderboard)
+
+    if pending:
+        print(f"Average import overhead per session: {session_import_time / len(pending):.4f} s")
 
-            # run a single negotiation session
-            _, session_results_summary = run_session(settings)
+    # restore the order of the sessions
+    tournament_results = [completed[key] for key in session_keys]
 
-            # assemble results
-            tournament_steps.append(settings)
-            tournament_results.append(session_results_summary)
+    if columnar_dir is not None:
+        write_sessions(session_keys, tournament_results, Path(columnar_dir, "sessions.parquet"))
 
+    # the summary is calculated from the sessions in tournament order, so that it does not
+    # depend on the order in which the sessions completed
     tournament_results_summary = process_tournament_results(tournament_results)
 
     return tournament_steps, tournament_results, tournament_results_summary
 
 
-def process_results(results_class: SAOPState, results_dict: dict):
+def merge_results_logs(results_logs: list) -> Tuple[list, list, pd.DataFrame]:
+    """Combine the results logs of the shards of a tournament.
+
+    Args:
+        results_logs (list): paths of the results logs, sessions that occur in multiple
+            logs are only counted once.
+
+    Raises:
+        ValueError: if the logs contain sessions of different tournaments.
+
+    Returns:
+        Tuple[list, list, pd.DataFrame]: session settings and session summaries in the order
+            of the tournament, and the tournament summary.
+    """
+    entries = {}
+    for path in results_logs:
+        for entry in ResultsLog(path).read_entries():
+            entries.setdefault(entry["key"], entry)
+
+    # positions are only meaningful within one tournament
+    tournaments = {e["tournament"] for e in entries.values() if "tournament" in e}
+    if len(tournaments) > 1:
+        raise ValueError(
+            f"The results logs contain sessions of {len(tournaments)} different tournaments, "
+            "only merge the shard logs of one tournament"
+        )
+
+    # restore the order of the sessions in the tournament, sessions without a position (logs
+    # of older versions) follow in log order
+    positioned = sorted(
+        (e for e in entries.values() if "position" in e), key=lambda e: e["position"]
+    )
+    unpositioned = [e for e in entries.values() if "position" not in e]
+    if unpositioned:
+        print(
+            f"WARNING: {len(unpositioned)} sessions have no position in the tournament, "
+            "they are added in log order"
+        )
+    if positioned:
+        missing = positioned[-1]["position"] + 1 - len(positioned)
+        if missing > 0:
+            print(f"WARNING: {missing} sessions of the tournament are missing from the results logs")
+
+    tournament_steps = [entry["settings"] for entry in positioned + unpositioned]
+    tournament_results = [entry["summary"] for entry in positioned + unpositioned]
+
+    return tournament_steps, tournament_results, process_tournament_results(tournament_results)
+
+
+def run_sessions(
+    sessions: list, workers: int = 1, session_limits: dict = None, columnar_dir=None
+):
+    """Run negotiation sessions and yield their summaries as soon as they finished.
+
+    Args:
+        sessions (list): (key, settings) tuples of the sessions to run.
+        workers (int, optional): number of processes to run sessions in. Defaults to 1.
+        session_limits (dict, optional): run every session in a separate process with the
+            limits `timeout_s`, `cpu_time_s` and/or `memory_mb`, see
+            `utils.session_watchdog.run_session_isolated`. Defaults to None.
+        columnar_dir (optional): directory to write the actions of every session to as a
+            parquet file named after the session key. Defaults to None.
+
+    Yields:
+        Tuple[str, dict, dict]: key, settings and summary of a finished session.
+    """
+    if session_limits is not None:
+        run_session_func = partial(run_session_isolated, **session_limits)
+    else:
+        run_session_func = run_session_summary
+
+    def session_kwargs(key) -> dict:
+        if columnar_dir is None:
+            return {}
+        return {
+            "actions_file": Path(columnar_dir, "actions", f"{key}.parquet"),
+            "session_id": key,
+        }
+
+    if workers > 1:
+        # fork the workers where possible, so that they start with the agent classes that
+        # are already imported. Otherwise every worker imports them once when it starts.
+        mp_context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        agents = [agent for _, settings in sessions for agent in settings["agents"]]
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=import_agent_classes,
+            initargs=(agents,),
+        ) as executor:
+            futures = {}
+            for key, settings in sessions:
+                future = executor.submit(run_session_func, settings, **session_kwargs(key))
+                futures[future] = (key, settings)
+            for future in as_completed(futures):
+                key, settings = futures[future]
+                yield key, settings, future.result()
+    else:
+        for key, settings in sessions:
+            yield key, settings, run_session_func(settings, **session_kwargs(key))
+
+
+def run_session_summary(settings, **kwargs) -> dict:
+    """Run a single negotiation session and only return its summary. The trace is
+    dropped so that it does not have to be send back from a worker process.
+
+    Args:
+        settings (dict): session settings, see `run_session`.
+        **kwargs: passed on to `run_session`.
+
+    Returns:
+        dict: summary of the session results, including the duration of the session and
+            the time spent importing the agent classes that were not imported yet.
+    """
+    import_time = import_agent_classes(settings["agents"])
+    start = time.perf_counter()
+    _, results_summary = run_session(settings, trace=False, **kwargs)
+    results_summary["duration_s"] = time.perf_counter() - start
+    results_summary["import_time_s"] = import_time
+    return results_summary
+
+
+def process_results(results_class: SAOPState, results_dict: dict, annotate: bool = True):
+    """Add the utilities of both parties to the offers in the trace and create a summary.
+
+    Args:
+        results_class (SAOPState): final state of the session
+        results_dict (dict): final state of the session in dict format
+        annotate (bool, optional): add the utilities to every offer in the trace, otherwise
+            only the utilities of the final offer are calculated. Defaults to True.
+
+    Returns:
+        Tuple[dict, dict]: trace and summary of the session
+    """
     # dict to translate geniusweb agent reference to Python class name
     agent_translate = {
         k: v["party"]["partyref"].split(".")[-1]
@@ -156,15 +470,10 @@ def process_results(results_class: SAOPState, results_dict: dict):
 
     # check if there are any actions (could have crashed)
     if results_dict["actions"]:
-        # obtain utility functions
-        utility_funcs = {
-            k: get_utility_function(v["profile"])
-            for k, v in results_dict["partyprofiles"].items()
-        }
-
-        # iterate both action classes and dict entries
+        # collect the offers and their bids of both action classes and dict entries
+        offers = []
+        bids = []
         actions_iter = zip(results_class.getActions(), results_dict["actions"])
-
         for action_class, action_dict in actions_iter:
             if "Offer" in action_dict:
                 offer = action_dict["Offer"]
@@ -173,18 +482,27 @@ def process_results(results_class: SAOPState, results_dict: dict):
             else:
                 continue
 
-            # add bid utility of both agents if bid is not None
             bid = action_class.getBid()
             if bid is None:
                 raise ValueError(
                     f"Found `None` value in sequence of actions: {action_class}"
                 )
-            else:
-                offer["utilities"] = {
-                    k: float(v.getUtility(bid)) for k, v in utility_funcs.items()
-                }
+            offers.append(offer)
+            bids.append(bid)
 
-            results_summary["num_offers"] += 1
+        results_summary["num_offers"] = len(offers)
+
+        # calculate the utilities of all offers at once, or of the final offer only
+        profile_uris = {k: v["profile"] for k, v in results_dict["partyprofiles"].items()}
+        annotated = offers if annotate else offers[-1:]
+        bid_utilities = get_bid_utilities(
+            list(profile_uris.values()), bids[len(bids) - len(annotated):]
+        )
+        for i, offer in enumerate(annotated):
+            offer["utilities"] = {
+                party: float(utilities[i])
+                for party, utilities in zip(profile_uris, bid_utilities)
+            }
 
         # gather a summary of results
         if "Accept" in action_dict:
@@ -208,14 +526,75 @@ def process_results(results_class: SAOPState, results_dict: dict):
     return results_dict, results_summary
 
 
-def get_utility_function(profile_uri) -> LinearAdditiveUtilitySpace:
-    profile_connection = ProfileConnectionFactory.create(
-        URI(profile_uri), StdOutReporter()
-    )
-    profile = profile_connection.getProfile()
-    assert isinstance(profile, LinearAdditiveUtilitySpace)
+def summarize_state(results_class: SAOPState) -> dict:
+    """Create the summary of a session directly from the session state, the summary is the
+    same as the one of `process_results`.
+
+    Args:
+        results_class (SAOPState): final state of the session
+
+    Returns:
+        dict: summary of the session results
+    """
+    party_profiles = results_class.getPartyProfiles()
+    actions = results_class.getActions()
+
+    results_summary = {"num_offers": 0}
+
+    if actions:
+        bid = None
+        for action in actions:
+            if isinstance(action, (Offer, Accept)):
+                bid = action.getBid()
+                results_summary["num_offers"] += 1
+
+        # the session ended with an agreement if the last action is an accept
+        if isinstance(actions[-1], Accept):
+            profile_uris = [
+                str(party_profile.getProfile().getURI())
+                for party_profile in party_profiles.values()
+            ]
+            utilities_final = [
+                float(utilities[0]) for utilities in get_bid_utilities(profile_uris, [bid])
+            ]
+            result = "agreement"
+        else:
+            utilities_final = [0, 0]
+            result = "failed"
+    else:
+        utilities_final = [0, 0]
+        result = "ERROR"
+
+    for i, (party_id, party_profile) in enumerate(party_profiles.items()):
+        position = party_id.getName().split("_")[-1]
+        partyref = str(party_profile.getParty().getPartyRef().getURI())
+        results_summary[f"agent_{position}"] = partyref.split(".")[-1]
+        results_summary[f"utility_{position}"] = utilities_final[i]
+    results_summary["nash_product"] = prod(utilities_final)
+    results_summary["social_welfare"] = sum(utilities_final)
+    results_summary["result"] = result
+
+    return results_summary
+
+
+def get_bid_utilities(profile_uris: list, bids: list) -> List[np.ndarray]:
+    """Utilities of bids for multiple profiles of the same domain. The bids are encoded to
+    bid ids once and the utilities are looked up in the precomputed utilities of the
+    profile cache.
+
+    Args:
+        profile_uris (list): profiles to calculate the utilities for
+        bids (list): bids to calculate the utilities of
+
+    Returns:
+        List[np.ndarray]: per profile, the utility of every bid
+    """
+    cached_profiles = [load_profile(profile_uri) for profile_uri in profile_uris]
+    for cached_profile in cached_profiles:
+        assert isinstance(cached_profile.profile, LinearAdditiveUtilitySpace)
 
-    return profile
+    bid_ids = cached_profiles[0].bid_space.bids_to_ids(bids)
+    return [cached_profile.utilities[bid_ids] for cached_profile in cached_profiles]
 
 
 def process_tournament_results(tournament_results):
@@ -0,0 +1,111 @@
+import multiprocessing
+import signal
+import traceback
+
+from utils.hash_seed import get_hash_seed
+
+try:
+    import resource
+except ImportError:
+    # resource limits are not available on Windows, only the wall-clock timeout is used
+    resource = None
+
+# failure reasons that can be found in the summary of a session under "failure"
+FAILURE_REASONS = ("timeout", "cpu_time_limit", "out_of_memory", "exception", "crashed")
+
+
+def run_session_isolated(
+    settings: dict,
+    timeout_s: float = None,
+    cpu_time_s: int = None,
+    memory_mb: int = None,
+    **kwargs,
+) -> dict:
+    """Run a negotiation session in a child process that is killed when it exceeds its
+    limits, so that a hanging or crashing agent only costs one session.
+
+    Args:
+        settings (dict): session settings, see `utils.runners.run_session`.
+        timeout_s (float, optional): wall-clock time limit of the session in seconds.
+            Defaults to None.
+        cpu_time_s (int, optional): CPU time limit of the session in seconds. Defaults to None.
+        memory_mb (int, optional): address space limit of the session in MB. Defaults to None.
+        **kwargs: passed on to `utils.runners.run_session_summary`.
+
+    Returns:
+        dict: summary of the session results. If the session failed, the result is "ERROR"
+            and the summary has a "failure" entry with the reason and details.
+    """
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_child,
+        args=(sender, settings, cpu_time_s, memory_mb, kwargs),
+        daemon=True,
+    )
+    process.start()
+    # close our copy of the sending end, so that recv fails if the child dies
+    sender.close()
+
+    try:
+        if receiver.poll(timeout_s):
+            status, payload = receiver.recv()
+        else:
+            status, payload = "timeout", f"session exceeded {timeout_s} s wall-clock time"
+    except EOFError:
+        status, payload = None, None
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+    if status == "ok":
+        return payload
+    if status is None:
+        # the child died without sending a result
+        if resource is not None and process.exitcode == -signal.SIGXCPU:
+            status, payload = "cpu_time_limit", f"session exceeded {cpu_time_s} s CPU time"
+        else:
+            status, payload = "crashed", f"session process exited with code {process.exitcode}"
+
+    return failed_summary(settings, status, payload)
+
+
+def failed_summary(settings: dict, reason: str, details: str) -> dict:
+    """Summary of a session that did not finish, in the format of `utils.runners.process_results`."""
+    results_summary = {"num_offers": 0}
+    for i, agent in enumerate(settings["agents"], start=1):
+        results_summary[f"agent_{i}"] = agent["class"].split(".")[-1]
+        results_summary[f"utility_{i}"] = 0
+    results_summary["nash_product"] = 0
+    results_summary["social_welfare"] = 0
+    results_summary["result"] = "ERROR"
+    results_summary["failure"] = {"reason": reason, "details": details}
+    if settings.get("seed") is not None:
+        results_summary["seed"] = settings["seed"]
+        results_summary["hash_seed"] = get_hash_seed()
+
+    return results_summary
+
+
+def _run_child(sender, settings: dict, cpu_time_s: int, memory_mb: int, kwargs: dict):
+    # imported here, so that the watchdog itself does not depend on geniusweb
+    from utils.runners import run_session_summary
+
+    if resource is not None:
+        if cpu_time_s is not None:
+            # SIGXCPU at the soft limit, SIGKILL at the hard limit
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_s, cpu_time_s + 1))
+        if memory_mb is not None:
+            memory_bytes = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+    try:
+        sender.send(("ok", run_session_summary(settings, **kwargs)))
+    except MemoryError:
+        sender.send(("out_of_memory", traceback.format_exc()))
+    except Exception:
+        sender.send(("exception", traceback.format_exc()))
+    finally:
+        sender.close()
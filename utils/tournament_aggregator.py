@@ -0,0 +1,113 @@
+import os
+from collections import defaultdict
+from math import sqrt
+
+import pandas as pd
+
+# statistics that are averaged per agent
+STATISTICS = ("utility", "nash_product", "social_welfare", "num_offers")
+# possible results of a session
+RESULTS = ("agreement", "failed", "ERROR")
+
+
+class RunningStat:
+    """Running mean and variance of a statistic (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStat"):
+        """Combine with the statistic of another set of values (Chan et al.)."""
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+
+    def get_variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def get_std(self) -> float:
+        return sqrt(self.get_variance())
+
+
+class TournamentAggregator:
+    """Aggregates session summaries into per agent statistics as soon as a session finished.
+    Only running statistics are kept, so memory does not grow with the number of sessions
+    and the leaderboard can be queried at any time during the tournament.
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: {desc: RunningStat() for desc in STATISTICS})
+        self.results = defaultdict(lambda: defaultdict(int))
+
+    def add(self, session_results: dict):
+        """Add the summary of a session, see `utils.runners.process_results`."""
+        agents = {k: v for k, v in session_results.items() if k.startswith("agent")}
+        for agent_id, agent_class in agents.items():
+            stats = self.stats[agent_class]
+            stats["utility"].add(session_results[f"utility_{agent_id.split('_')[1]}"])
+            stats["nash_product"].add(session_results["nash_product"])
+            stats["social_welfare"].add(session_results["social_welfare"])
+            if "num_offers" in session_results:
+                stats["num_offers"].add(session_results["num_offers"])
+            self.results[agent_class][session_results["result"]] += 1
+
+    def merge(self, other: "TournamentAggregator"):
+        """Add the statistics of another aggregator, e.g. of another part of the tournament."""
+        for agent_class, stats in other.stats.items():
+            for desc, stat in stats.items():
+                self.stats[agent_class][desc].merge(stat)
+        for agent_class, results in other.results.items():
+            for result, count in results.items():
+                self.results[agent_class][result] += count
+
+    def get_leaderboard(self, include_std: bool = False) -> pd.DataFrame:
+        """Summary of the tournament so far, sorted on average utility.
+
+        Args:
+            include_std (bool, optional): add the standard deviation of every statistic.
+                Defaults to False.
+
+        Returns:
+            pd.DataFrame: statistics per agent
+        """
+        column_order = [f"avg_{desc}" for desc in STATISTICS]
+        if include_std:
+            column_order += [f"std_{desc}" for desc in STATISTICS]
+        column_order += ["count", *RESULTS]
+
+        leaderboard = {}
+        for agent_class, stats in self.stats.items():
+            num_sessions = stats["utility"].count
+            row = {result: self.results[agent_class][result] for result in RESULTS}
+            for desc, stat in stats.items():
+                # averaged over all sessions of the agent, like a missing value counts as 0
+                row[f"avg_{desc}"] = stat.mean * stat.count / num_sessions if num_sessions else 0.0
+                row[f"std_{desc}"] = stat.get_std()
+            row["count"] = num_sessions
+            leaderboard[agent_class] = row
+
+        leaderboard = pd.DataFrame.from_dict(leaderboard, orient="index", columns=column_order)
+        leaderboard = leaderboard.astype({column: int for column in ["count", *RESULTS]})
+        leaderboard.sort_values("avg_utility", ascending=False, inplace=True)
+
+        return leaderboard
+
+    def to_csv(self, path):
+        """Write the leaderboard to a csv file. The file is replaced atomically, so it can be
+        read at any time while the tournament is running.
+        """
+        tmp_path = f"{path}.tmp"
+        self.get_leaderboard().to_csv(tmp_path)
+        os.replace(tmp_path, path)
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from math import ceil
+from typing import Dict, List, Tuple
+
+from utils.results_log import ResultsLog
+
+
+class AgentHistory:
+    """Timing of the agents in the sessions of previous tournaments, read from their results
+    logs. Only sessions with a recorded duration are used.
+    """
+
+    def __init__(self, results_logs: list = ()):
+        durations = defaultdict(list)
+        latencies = defaultdict(list)
+        for path in results_logs:
+            for entry in ResultsLog(path).read_entries():
+                summary = entry["summary"]
+                if "duration_s" not in summary:
+                    continue
+                agents = [v for k, v in summary.items() if k.startswith("agent")]
+                for agent_class in agents:
+                    durations[agent_class].append(summary["duration_s"])
+                    if summary["num_offers"] > 0:
+                        latencies[agent_class].append(
+                            summary["duration_s"] / summary["num_offers"]
+                        )
+
+        # mean session duration and mean time per action (turn latency) per agent class
+        self.session_duration: Dict[str, float] = {
+            k: sum(v) / len(v) for k, v in durations.items()
+        }
+        self.turn_latency: Dict[str, float] = {
+            k: sum(v) / len(v) for k, v in latencies.items()
+        }
+
+
+def estimate_session_cost(settings: dict, history: AgentHistory) -> float:
+    """Estimate the wall-clock duration of a session in seconds. The deadline is an upper
+    bound. With a round based deadline the number of turns is known and the estimate is based
+    on the turn latency of the agents, otherwise on their previous session durations.
+
+    Args:
+        settings (dict): session settings, see `utils.runners.run_session`
+        history (AgentHistory): timing of the agents in previous tournaments
+
+    Returns:
+        float: estimated duration in seconds
+    """
+    deadline_rounds = settings.get("deadline_rounds")
+    deadline_time_ms = settings.get("deadline_time_ms")
+    if deadline_time_ms is None:
+        deadline_time_ms = 60000
+    if settings.get("virtual_turn_ms") is not None:
+        # number of rounds of the virtual clock, see `utils.virtual_clock.VirtualClock`
+        deadline_rounds = ceil(deadline_time_ms / (settings["virtual_turn_ms"] * 2))
+    max_cost = deadline_time_ms / 1000
+
+    agent_classes = [agent["class"].split(".")[-1] for agent in settings["agents"]]
+    if deadline_rounds is not None:
+        latencies = [history.turn_latency.get(a) for a in agent_classes]
+        if None not in latencies:
+            return min(deadline_rounds * sum(latencies), max_cost)
+    else:
+        durations = [history.session_duration.get(a) for a in agent_classes]
+        if None not in durations:
+            return min(sum(durations) / len(durations), max_cost)
+
+    return max_cost
+
+
+def plan_sessions(sessions: List[tuple], history: AgentHistory) -> Tuple[List[tuple], float]:
+    """Order sessions longest first, so that the longest sessions do not end up at the tail
+    of a worker pool.
+
+    Args:
+        sessions (List[tuple]): (key, settings) tuples of the sessions
+        history (AgentHistory): timing of the agents in previous tournaments
+
+    Returns:
+        Tuple[List[tuple], float]: ordered sessions and the estimated total cost in seconds
+    """
+    costs = [estimate_session_cost(settings, history) for _, settings in sessions]
+    order = sorted(range(len(sessions)), key=lambda i: costs[i], reverse=True)
+
+    return [sessions[i] for i in order], sum(costs)
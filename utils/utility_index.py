@@ -0,0 +1,99 @@
+from typing import Iterator
+
+import numpy as np
+from geniusweb.issuevalue.Bid import Bid
+from geniusweb.profile.utilityspace.LinearAdditive import LinearAdditive
+from tudelft.utilities.immutablelist.ImmutableList import ImmutableList
+
+from utils.bid_space import BidSpace
+
+
+class BidIdList(ImmutableList[Bid]):
+    """Lazy list of the bids of an array of bid ids, a Bid is only created when it is
+    accessed. Selecting bids is O(1) regardless of the number of bids in the list.
+    """
+
+    def __init__(self, bid_space: BidSpace, bid_ids: np.ndarray):
+        self._bid_space = bid_space
+        self._bid_ids = bid_ids
+
+    def get(self, index: int) -> Bid:
+        return self._bid_space.id_to_bid(self._bid_ids[int(index)])
+
+    def size(self) -> int:
+        return len(self._bid_ids)
+
+    def __len__(self) -> int:
+        return len(self._bid_ids)
+
+    def __iter__(self) -> Iterator[Bid]:
+        return (self._bid_space.id_to_bid(bid_id) for bid_id in self._bid_ids)
+
+    def __repr__(self) -> str:
+        return f"BidIdList(size={self.size()})"
+
+
+class SortedUtilityIndex:
+    """All bids of a profile sorted on utility. Bids within a utility interval or
+    nearest to a utility are found by binary search instead of scanning the bid space.
+    """
+
+    def __init__(self, profile: LinearAdditive, bid_space: BidSpace = None):
+        self.profile = profile
+        self.bid_space = bid_space if bid_space is not None else BidSpace(profile.getDomain())
+
+        self.utility_tables = self.bid_space.get_utility_tables(profile)
+        utilities = self.bid_space.evaluate(self.utility_tables)
+        # bid ids sorted on utility, utilities[i] is the utility of bid_ids[i]
+        self.bid_ids = np.argsort(utilities, kind="stable")
+        self.utilities = utilities[self.bid_ids]
+
+    def get_min(self) -> float:
+        return float(self.utilities[0])
+
+    def get_max(self) -> float:
+        return float(self.utilities[-1])
+
+    def get_tolerance(self) -> float:
+        """Minimum difference between the weighted utility of the best and one-but-best
+        value of an issue, or 1 if no issue has more than one value.
+        """
+        tolerance = 1.0
+        for utility_table in self.utility_tables:
+            if len(utility_table) > 1:
+                best, one_but_best = np.sort(utility_table)[-2:][::-1]
+                tolerance = min(tolerance, best - one_but_best)
+        return float(tolerance)
+
+    def get_bid_ids(self, lower: float, upper: float) -> np.ndarray:
+        """Ids of the bids with a utility in the interval [lower, upper], sorted on utility."""
+        start = np.searchsorted(self.utilities, lower, side="left")
+        end = np.searchsorted(self.utilities, upper, side="right")
+        return self.bid_ids[start:end]
+
+    def get_bids(self, lower: float, upper: float) -> BidIdList:
+        """Bids with a utility in the interval [lower, upper] in bid id order, the order in
+        which all bids are enumerated, so that taking the first bids does not select on utility.
+        """
+        return BidIdList(self.bid_space, np.sort(self.get_bid_ids(lower, upper)))
+
+    def get_nearest_bid_ids(self, utility: float, k: int = 1) -> np.ndarray:
+        """Ids of the k bids with the utility closest to the given utility.
+
+        Args:
+            utility (float): utility to search for
+            k (int, optional): number of bids. Defaults to 1.
+
+        Returns:
+            np.ndarray: bid ids, sorted on distance to the utility
+        """
+        position = np.searchsorted(self.utilities, utility)
+        # the k nearest bids are within k positions from the insertion point
+        start = max(position - k, 0)
+        end = min(position + k, len(self.utilities))
+        distances = np.abs(self.utilities[start:end] - utility)
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return self.bid_ids[start + nearest]
+
+    def get_nearest_bids(self, utility: float, k: int = 1) -> BidIdList:
+        return BidIdList(self.bid_space, self.get_nearest_bid_ids(utility, k))
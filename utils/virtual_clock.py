@@ -0,0 +1,147 @@
+from datetime import datetime
+from math import ceil
+from typing import List
+
+from geniusweb.actions.Action import Action
+from geniusweb.inform.ActionDone import ActionDone
+from geniusweb.inform.Settings import Settings
+from geniusweb.progress.ProgressRounds import ProgressRounds
+from geniusweb.progress.ProgressTime import ProgressTime
+from geniusweb.references.PartyRef import PartyRef
+from geniusweb.simplerunner.ClassPathConnectionFactory import ClassPathConnectionFactory
+
+
+class VirtualClock:
+    """Simulated session time. Instead of following the wall-clock, time advances by a
+    fixed cost for every action that is done in the session.
+    """
+
+    def __init__(self, duration_ms: int, turn_ms: int):
+        self.duration_ms = duration_ms
+        self.turn_ms = turn_ms
+        self.elapsed_ms = 0
+        self._last_action: Action = None
+
+    def num_rounds(self, num_parties: int = 2) -> int:
+        """Number of SAOP rounds after which the virtual deadline is reached."""
+        return ceil(self.duration_ms / (self.turn_ms * num_parties))
+
+    def observe(self, action: Action):
+        """Advance the clock for an action. Every action is broadcast to all parties,
+        so the clock only advances the first time an action is observed.
+        """
+        if action is not self._last_action:
+            self._last_action = action
+            self.elapsed_ms += self.turn_ms
+
+    def get_progress(self) -> float:
+        return min(self.elapsed_ms / self.duration_ms, 1.0)
+
+    def create_progress(self) -> "VirtualProgressTime":
+        return VirtualProgressTime(self)
+
+
+class VirtualProgressTime(ProgressTime):
+    """ProgressTime that reports the progress of a VirtualClock. Agents keep calling
+    `progress.get(time() * 1000)`, the passed timestamp is ignored.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__(clock.duration_ms, datetime.now())
+        self._clock = clock
+
+    def get(self, currentTimeMs: int) -> float:
+        return self._clock.get_progress()
+
+    def isPastDeadline(self, currentTimeMs: int) -> bool:
+        return self._clock.elapsed_ms > self._clock.duration_ms
+
+
+class RoundsClock:
+    """Counts the SAOP rounds of a session with a DeadlineRounds deadline. A round has
+    passed when every party has done an action.
+    """
+
+    def __init__(self, rounds: int, duration_ms: int, num_parties: int = 2):
+        self.rounds = rounds
+        self.duration_ms = duration_ms
+        self.num_parties = num_parties
+        self.num_actions = 0
+        self._last_action: Action = None
+
+    def observe(self, action: Action):
+        """Count an action. Every action is broadcast to all parties, so it is only
+        counted the first time it is observed.
+        """
+        if action is not self._last_action:
+            self._last_action = action
+            self.num_actions += 1
+
+    def get_round(self) -> int:
+        return min(self.num_actions // self.num_parties, self.rounds)
+
+    def create_progress(self) -> "LiveProgressRounds":
+        return LiveProgressRounds(self)
+
+
+class LiveProgressRounds(ProgressRounds):
+    """ProgressRounds that follows the rounds of the running session. Agents that never
+    call `advance()` themselves still see the round progress through `get`.
+    """
+
+    def __init__(self, clock: RoundsClock):
+        end_time = datetime.fromtimestamp(datetime.now().timestamp() + clock.duration_ms / 1000)
+        super().__init__(clock.rounds, 0, end_time)
+        self._clock = clock
+
+    def getCurrentRound(self) -> int:
+        return self._clock.get_round()
+
+    def get(self, currentTimeMs: int) -> float:
+        return self._clock.get_round() / self._clock.rounds
+
+    def isPastDeadline(self, currentTimeMs: int) -> bool:
+        return (
+            self._clock.get_round() >= self._clock.rounds
+            or currentTimeMs > self.getTerminationTime().timestamp() * 1000
+        )
+
+
+class VirtualClockConnectionFactory(ClassPathConnectionFactory):
+    """Connection factory that hands the parties a progress object of a VirtualClock or
+    RoundsClock and advances the clock on every action that is done.
+    """
+
+    def __init__(self, clock):
+        super().__init__()
+        self._clock = clock
+
+    def connect(self, reference: PartyRef):
+        return _VirtualClockConnection(super().connect(reference), self._clock)
+
+    def connectAll(self, references: List[PartyRef]) -> list:
+        return [self.connect(reference) for reference in references]
+
+
+class _VirtualClockConnection:
+    """Wraps a protocol to party connection, everything except `send` is passed on."""
+
+    def __init__(self, connection, clock: VirtualClock):
+        self._connection = connection
+        self._clock = clock
+
+    def send(self, data):
+        if isinstance(data, Settings):
+            data = Settings(
+                data.getID(),
+                data.getProfile(),
+                data.getProtocol(),
+                self._clock.create_progress(),
+                data.getParameters(),
+            )
+        elif isinstance(data, ActionDone):
+            self._clock.observe(data.getAction())
+        self._connection.send(data)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)